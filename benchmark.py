@@ -0,0 +1,526 @@
+'''
+Benchmarks of dateparser, they aren't tests so they aren't run by pytest.
+
+py benchmark.py            runs every benchmark
+py benchmark.py import     runs only the import benchmark
+'''
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+RUNS = 10
+
+
+''' Print the median time of a list of seconds in milliseconds '''
+def report(name, times):
+    times = sorted(times)
+    print("%-45s %12.4f ms" % (name, times[len(times) // 2] * 1000))
+
+
+''' Time `import dateparser` in a new interpreter, returns seconds '''
+def time_import(code="import dateparser"):
+    script = "import time; t = time.perf_counter(); %s; print(time.perf_counter() - t)" % code
+    output = subprocess.run([sys.executable, "-c", script], cwd=HERE, check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+''' Remove the glossary snapshots of every language '''
+def remove_snapshots():
+    import dateparser
+    for name in os.listdir(dateparser.SNAPSHOT_DIR):
+        if name.startswith('glossary.') and name.endswith('.pickle'):
+            os.remove(os.path.join(dateparser.SNAPSHOT_DIR, name))
+
+
+''' Import time, and time of the first parse (which loads the glossary), with and without snapshots '''
+def bench_import():
+    import dateparser
+
+    first_parse = "import dateparser; dateparser.parse('tomorrow')"
+    # warm up the imported libraries (pytz, dateutil) so every case pays the same for them
+    time_import(first_parse)
+    report("import", [time_import() for _ in range(RUNS)])
+    report("import + first parse with snapshot", [time_import(first_parse) for _ in range(RUNS)])
+    without_snapshot = []
+    for _ in range(RUNS):
+        remove_snapshots()
+        without_snapshot.append(time_import(first_parse))
+    report("import + first parse without snapshot", without_snapshot)
+
+    # only the glossary of one language
+    with_snapshot = []
+    without_snapshot = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        dateparser.load_glossary('en')
+        with_snapshot.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        dateparser.load_glossary('en', snapshot_dir=None)
+        without_snapshot.append(time.perf_counter() - start)
+    report("load_glossary('en') with snapshot", with_snapshot)
+    report("load_glossary('en') without snapshot", without_snapshot)
+
+
+''' Memory allocated by loading one language and every language '''
+def bench_memory():
+    import tracemalloc
+    import dateparser
+
+    languages = list(json.load(open(dateparser.GLOSSARY_PATH)))
+    for name, used in (("one language", languages[:1]), ("every language", languages)):
+        dateparser.COMPILED_GLOSSARY.clear()
+        tracemalloc.start()
+        for language in used:
+            dateparser.get_glossary(language)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("%-40s %10.1f KiB" % ("memory of " + name, current / 1024))
+
+
+''' Time of get_timezone for a text that isn't a timezone and one that is, against scanning pytz.all_timezones '''
+def bench_timezone():
+    import timeit
+    import pytz
+    import dateparser
+
+    number = 10000
+    base_date = datetime(2024, 5, 2, 9, 35)
+    scan = lambda text: [pytz.timezone(x) for x in pytz.all_timezones if text in x.lower()]
+    for text in ('5pm_tomorrow', 'buenos_aires'):
+        report("scan all timezones '%s'" % text, [timeit.timeit(lambda: scan(text), number=100) / 100 for _ in range(RUNS)])
+        report("get_timezone '%s'" % text, [timeit.timeit(lambda: dateparser.get_timezone(text, base_date), number=number) / number for _ in range(RUNS)])
+        dateparser.find_timezone_names.cache_clear()
+        report("index search '%s' (not cached)" % text, [timeit.timeit(lambda: dateparser.TIMEZONE_INDEX.search(text), number=number) / number for _ in range(RUNS)])
+
+
+''' Import time and time per parse of a text with timezone, with pytz and with zoneinfo '''
+def bench_timezone_backend():
+    import timeit
+    import dateparser
+
+    first_parse = ("import dateparser; dateparser.parse('5am buenos aires', "
+        "locale_timezone=dateparser.get_timezone_backend().timezone('America/Chicago'))")
+    number = 2000
+    for backend in ('pytz', 'zoneinfo'):
+        os.environ['DATEPARSER_TZ_BACKEND'] = backend
+        time_import(first_parse)
+        report("import + first parse (%s)" % backend, [time_import(first_parse) for _ in range(RUNS)])
+        del os.environ['DATEPARSER_TZ_BACKEND']
+
+        tz = dateparser.set_timezone_backend(backend).timezone('America/Chicago')
+        base_date = datetime(2024, 5, 2, 9, 35)
+        for text in ('5am buenos aires', 'tomorrow 10am'):
+            parse = lambda: dateparser.parse(text, base_date=base_date, locale_timezone=tz)
+            report("parse '%s' (%s)" % (text, backend), [timeit.timeit(parse, number=number) / number for _ in range(RUNS)])
+    dateparser.set_timezone_backend('pytz')
+
+
+''' Memory blocks allocated and peak of traced memory per parse.
+
+Blocks are counted with a line tracer that adds every increase of sys.getallocatedblocks(), so blocks
+allocated and freed inside a single line or C call aren't counted. It's only useful to compare versions of parse.
+'''
+def bench_allocations():
+    import tracemalloc
+    import dateparser
+
+    base_date = datetime(2024, 5, 2, 9, 35)
+    texts = ['tomorrow 5pm', 'next friday at 10 am', 'in 2 days and 3 hours', 'jan 15th 2025 10:30pm', '2mo 3d', '17 40']
+    state = {}
+
+    def tracer(frame, event, arg):
+        blocks = sys.getallocatedblocks()
+        if blocks > state['last']:
+            state['allocated'] += blocks - state['last']
+        state['last'] = blocks
+        return tracer
+
+    for text in texts:
+        dateparser.parse(text, base_date=base_date)
+        state['last'] = sys.getallocatedblocks()
+        state['allocated'] = 0
+        sys.settrace(tracer)
+        dateparser.parse(text, base_date=base_date)
+        sys.settrace(None)
+
+        tracemalloc.start()
+        current, _ = tracemalloc.get_traced_memory()
+        dateparser.parse(text, base_date=base_date)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("%-45s %6d blocks %8d B peak" % ("parse '%s'" % text, state['allocated'], peak - current))
+
+
+''' Time per parse of repeated texts, with the interpretations cached and without them '''
+def bench_interpret():
+    import timeit
+    import dateparser
+
+    number = 2000
+    base_date = datetime(2024, 5, 2, 9, 35)
+    tz = dateparser.get_timezone_backend().timezone('America/Chicago')
+    texts = ['tomorrow 5pm', 'next friday at 10 am', 'in 2 days and 3 hours', 'jan 15th 2025 10:30pm', '5am buenos aires']
+    for text in texts:
+        parse = lambda: dateparser.parse(text, base_date=base_date, locale_timezone=tz)
+        uncached = lambda: (dateparser.clear_interpret_cache(), parse())
+        report("parse '%s' (not cached)" % text, [timeit.timeit(uncached, number=number) / number for _ in range(RUNS)])
+        report("parse '%s' (cached)" % text, [timeit.timeit(parse, number=number) / number for _ in range(RUNS)])
+
+
+''' Time of interpret (not cached) of texts with times, ordinals, quarters and dates with separators, and of
+classifying their words with NUMERIC_WORD_KINDS
+'''
+def bench_numeric_words():
+    import timeit
+    import dateparser
+
+    number = 2000
+    base_date = datetime(2024, 5, 2, 9, 35)
+    texts = ['10:30pm', '15th 10:30', '5/2 5pm', 'q3 2025', '2024-06-03 10:30:15', '1st 0830', '17 40']
+    for text in texts:
+        interpret = lambda: (dateparser.clear_interpret_cache(), dateparser.interpret(text, base_date=base_date))
+        report("interpret '%s' (not cached)" % text, [timeit.timeit(interpret, number=number) / number for _ in range(RUNS)])
+    words = [x for text in texts for x in text.split() if not x.isdigit()]
+    classify = lambda: [dateparser.NUMERIC_WORD_KINDS.fullmatch(x) for x in words]
+    report("classify %d words" % len(words), [timeit.timeit(classify, number=number) / number for _ in range(RUNS)])
+
+
+''' Time per call of normalize on ASCII, mixed and accented corpora, and of NFKD of the whole text (what
+normalize did for every text before)
+'''
+def bench_normalize():
+    import random
+    import timeit
+    import unicodedata
+    import dateparser
+
+    def nfkd(text):
+        return "".join([c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c)]).lower()
+
+    random.seed(1)
+    ascii_texts = ['Tomorrow 5pm', 'next Friday at 10 am', 'in 2 days and 3 hours', 'Jan 15th 2025 10:30pm', 'q3']
+    accented_texts = ['mañana a las 5pm', 'el miércoles', 'próximo sábado', 'en 2 días', 'Mañana 10:30']
+    corpora = {
+        "ascii": ascii_texts,
+        "mixed 10% accented": [random.choice(accented_texts if random.random() < 0.1 else ascii_texts) for _ in range(1000)],
+        "accented": accented_texts,
+    }
+    for name, texts in corpora.items():
+        number = 20000 // len(texts) + 1
+        for label, function in (("NFKD", nfkd), ("normalize", dateparser.normalize)):
+            run = lambda: [function(x) for x in texts]
+            report("%s (%s)" % (label, name), [timeit.timeit(run, number=number) / number / len(texts) for _ in range(RUNS)])
+
+
+''' Time of future_datetime of a weekday and a day of the month (and a month), i.e. "monday 3rd january", for every
+weekday, day and month, the median and the worst of them
+'''
+def bench_weekday_search():
+    import dateparser
+
+    base_date = datetime(2024, 5, 2, 9, 35)
+    times = []
+    for weekday in range(7):
+        for day_number in range(1, 29):
+            for month in [None] + list(range(1, 13)):
+                start = time.perf_counter()
+                dateparser.future_datetime(weekday=weekday, day_number=day_number, month=month, base_date=base_date)
+                times.append(time.perf_counter() - start)
+    report("weekday and day (%d combinations, median)" % len(times), times)
+    report("weekday and day (worst)", [max(times)])
+
+
+''' Time per future_datetime of every branch that looks up weekdays and month lengths '''
+def bench_calendar_branches():
+    import timeit
+    import dateparser
+
+    number = 20000
+    base_date = datetime(2024, 5, 31, 21, 35)
+    branches = {
+        "weekend": dict(special=dateparser.WEEKEND),
+        "next week": dict(special=dateparser.NEXT_WEEK),
+        "next month": dict(special=dateparser.NEXT_MONTH),
+        "next quarter": dict(special=dateparser.NEXT_QUARTER),
+        "next year": dict(special=dateparser.NEXT_YEAR),
+        "weekday": dict(weekday=4),
+        "weekday and day": dict(weekday=0, day_number=3),
+        "weekday and month": dict(weekday=4, month=2),
+        "weekday and year": dict(weekday=6, year=2024),
+        "31st (next month that has it)": dict(day_number=31, hour=10),
+        "29th of february": dict(day_number=29, month=2),
+    }
+    for name, arguments in branches.items():
+        run = lambda: dateparser.future_datetime(base_date=base_date, **arguments)
+        report("future_datetime %s" % name, [timeit.timeit(run, number=number) / number for _ in range(RUNS)])
+
+
+''' Time per parse of repeated texts at base dates one second apart, without and with a ResultCache '''
+def bench_result_cache():
+    import timeit
+    import dateparser
+    from datetime import timedelta
+
+    number = 2000
+    tz = dateparser.get_timezone_backend().timezone('America/Chicago')
+    texts = ['tomorrow', 'next week', 'friday 5pm', 'in 2 hours', '15th 10:30']
+    for text in texts:
+        for name, cache in (("no cache", None), ("result cache", dateparser.ResultCache())):
+            base_dates = iter([datetime(2024, 5, 2, 9, 35) + timedelta(seconds=x) for x in range(number * RUNS)])
+            parse = lambda: dateparser.parse(text, base_date=next(base_dates), locale_timezone=tz, cache=cache)
+            report("parse '%s' (%s)" % (text, name), [timeit.timeit(parse, number=number) / number for _ in range(RUNS)])
+
+
+''' Time of a batch of texts with few different ones, calling parse for each text and with parse_many '''
+def bench_parse_many():
+    import random
+    import dateparser
+
+    phrases = ['tomorrow', 'next week', 'friday 5pm', 'in 2 hours', '15th 10:30', 'jan 15th 2025', 'tonight', 'q3']
+    random.seed(1)
+    texts = [random.choice(phrases) + ' ' * random.randint(0, 1) for _ in range(10000)]
+    tz = dateparser.get_timezone_backend().timezone('America/Chicago')
+    base_date = datetime(2024, 5, 2, 9, 35)
+
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        [dateparser.parse(x, base_date=base_date, locale_timezone=tz) for x in texts]
+        times.append(time.perf_counter() - start)
+    report("parse x %d" % len(texts), times)
+
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        dateparser.parse_many(texts, base_date=base_date, locale_timezone=tz)
+        times.append(time.perf_counter() - start)
+    report("parse_many %d" % len(texts), times)
+
+
+''' Time of resolving a batch of parts, with resolve for each one and with resolve_many (NumPy datetime64) '''
+def bench_resolve_many():
+    import random
+    from datetime import timedelta
+    import dateparser
+
+    phrases = ['tomorrow', 'next week', 'friday 5pm', 'in 2 hours', '15th 10:30', 'jan 15th 2025', 'tonight', 'q3']
+    random.seed(1)
+    base_date = datetime(2024, 5, 2, 9, 35)
+    parts = [dateparser.interpret(random.choice(phrases), base_date=base_date) for _ in range(100000)]
+    base_dates = [base_date + timedelta(seconds=random.randint(0, 86400 * 20)) for _ in parts]
+
+    for name, bases in (("same base date", [base_date] * len(parts)), ("base date per row", base_dates)):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            [dateparser.resolve(x, y) for x, y in zip(parts, bases)]
+            times.append(time.perf_counter() - start)
+        report("resolve x %d (%s)" % (len(parts), name), times)
+
+        times = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            dateparser.resolve_many(parts, bases[0] if name == "same base date" else bases)
+            times.append(time.perf_counter() - start)
+        report("resolve_many %d (%s)" % (len(parts), name), times)
+
+
+''' Time of parse_many of many different texts in this process and in a pool of 1 to cpu_count() workers '''
+def bench_workers():
+    import random
+    import dateparser
+
+    phrases = ['tomorrow', 'next week', 'friday %dpm', 'in %d hours', '%dth 10:30', 'jan %dth 2025', 'q3', 'in %d days']
+    random.seed(1)
+    texts = [random.choice(phrases).replace('%d', str(random.randint(1, 9))) + ' ' + str(random.randint(0, 10 ** 6))
+        for _ in range(20000)]
+    base_date = datetime(2024, 5, 2, 9, 35)
+
+    counts = [None] + sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in counts:
+        times = []
+        for _ in range(3):
+            dateparser.clear_interpret_cache()
+            start = time.perf_counter()
+            dateparser.parse_many(texts, base_date=base_date, workers=workers)
+            times.append(time.perf_counter() - start)
+        report("parse_many %d (%s)" % (len(texts), "%d workers" % workers if workers else "this process"), times)
+
+
+''' Time of a date from a shell: the command line, the client of a daemon, and a request of an open client '''
+def bench_daemon():
+    import tempfile
+    import threading
+    import timeit
+    import dateparser
+    from dateparser_client import Client
+
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, 'dateparser.sock')
+    server = dateparser.make_server(path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def run(args, text=None):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m'] + args, input=text, cwd=HERE, check=True, capture_output=True, text=True)
+        return time.perf_counter() - start
+
+    report("python -m dateparser", [run(['dateparser', '--tz', 'America/Chicago'], 'tomorrow 5pm\n') for _ in range(RUNS)])
+    report("python -m dateparser_client", [run(['dateparser_client', '--socket', path, '--tz', 'America/Chicago',
+        'tomorrow 5pm']) for _ in range(RUNS)])
+    number = 1000
+    with Client(path) as client:
+        request = lambda: client.parse('tomorrow 5pm', tz='America/Chicago')
+        report("request of an open client", [timeit.timeit(request, number=number) / number for _ in range(RUNS)])
+    server.shutdown()
+    server.server_close()
+    directory.cleanup()
+
+
+''' Time of 5000 concurrent parse calls of asyncio tasks, every one in the executor and batched by AsyncParser,
+and how many times a task that sleeps 1 ms woke up meanwhile (the event loop isn't blocked)
+'''
+def bench_async():
+    import asyncio
+    import functools
+    import random
+    import dateparser
+
+    random.seed(1)
+    phrases = ['tomorrow', 'next week', 'friday 5pm', 'in 2 hours', '15th 10:30', 'jan 15th 2025', 'tonight', 'q3']
+    texts = [random.choice(phrases) for _ in range(5000)]
+    base_date = datetime(2024, 5, 2, 9, 35)
+
+    async def in_executor(text):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(dateparser.parse, text, base_date=base_date))
+
+    async def run(name, parse):
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+        task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*[parse(x) for x in texts])
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        print("%-45s %12.4f ms %6d ticks" % (name, elapsed * 1000, ticks))
+
+    async def main():
+        await run("run_in_executor(parse) x %d" % len(texts), in_executor)
+        parser = dateparser.AsyncParser()
+        await run("AsyncParser.parse x %d" % len(texts), lambda x: parser.parse(x, base_date=base_date))
+
+    asyncio.run(main())
+
+
+''' Time of search in documents of 1 to 64 KB (it's linear in the size), and of parsing every window of up to
+MAX_SEARCH_WORDS words, which is what callers did before search
+'''
+def bench_search():
+    import random
+    import dateparser
+
+    random.seed(1)
+    sentences = ["The report is due tomorrow at 5pm.", "I have 3 apples and 2 oranges in the fridge.",
+        "Can we move the review to next friday at 10 am?", "The deploy is on 2024-06-03 10:30, or in 2 days.",
+        "Monday, May 20th is a holiday.", "Ping me in 45 minutes, or at 17:40.",
+        "Nothing about dates in this sentence, only words about the weather and the build.",
+        "Please send the invoice before jan 15th 2025 to the accounting team.\n"]
+    base_date = datetime(2024, 5, 2, 9, 35)
+
+    for size in (1, 4, 16, 64):
+        words = []
+        while sum(len(x) + 1 for x in words) < size * 1024:
+            words.append(random.choice(sentences))
+        document = ' '.join(words)
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            found = list(dateparser.search(document, base_date=base_date))
+            times.append(time.perf_counter() - start)
+        report("search %d KB (%d dates)" % (size, len(found)), times)
+
+        if size <= 4:
+            tokens = document.split()
+            start = time.perf_counter()
+            for i in range(len(tokens)):
+                for j in range(i + 1, min(len(tokens), i + dateparser.MAX_SEARCH_WORDS) + 1):
+                    try:
+                        dateparser.parse(' '.join(tokens[i:j]), base_date=base_date)
+                    except dateparser.PARSE_ERRORS:
+                        pass
+            report("parse of every window %d KB" % size, [time.perf_counter() - start])
+
+
+''' Time of parse of different ISO 8601 and RFC 2822 timestamps, with the fast path and with interpret and resolve '''
+def bench_timestamp():
+    import random
+    from datetime import timedelta
+    import dateparser
+
+    random.seed(1)
+    base_date = datetime(2024, 5, 2, 9, 35)
+    dates = [base_date + timedelta(seconds=random.randint(0, 86400 * 365)) for _ in range(10000)]
+    forms = {
+        "iso date and time": [x.strftime('%Y-%m-%d %H:%M') for x in dates],
+        "iso with seconds": [x.strftime('%Y-%m-%d %H:%M:%S') for x in dates],
+        "rfc 2822": [x.strftime('%a, %d %b %Y %H:%M:%S +0000') for x in dates],
+    }
+    for name, texts in forms.items():
+        times = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            [dateparser.parse(x, base_date=base_date, locale_timezone=dateparser.UTC) for x in texts]
+            times.append(time.perf_counter() - start)
+        report("parse x %d (%s)" % (len(texts), name), times)
+
+        times = []
+        utc_base_date = base_date.replace(tzinfo=dateparser.UTC)
+        for _ in range(3):
+            dateparser.clear_interpret_cache()
+            start = time.perf_counter()
+            for text in texts:
+                try:
+                    dateparser.resolve(dateparser.interpret(text, base_date=utc_base_date), utc_base_date, dateparser.UTC)
+                except dateparser.PARSE_ERRORS:
+                    pass
+            times.append(time.perf_counter() - start)
+        report("interpret and resolve x %d (%s)" % (len(texts), name), times)
+
+
+BENCHMARKS = {
+    'import': bench_import,
+    'memory': bench_memory,
+    'timezone': bench_timezone,
+    'timezone_backend': bench_timezone_backend,
+    'allocations': bench_allocations,
+    'interpret': bench_interpret,
+    'numeric_words': bench_numeric_words,
+    'normalize': bench_normalize,
+    'result_cache': bench_result_cache,
+    'weekday_search': bench_weekday_search,
+    'calendar_branches': bench_calendar_branches,
+    'parse_many': bench_parse_many,
+    'resolve_many': bench_resolve_many,
+    'workers': bench_workers,
+    'daemon': bench_daemon,
+    'async': bench_async,
+    'search': bench_search,
+    'timestamp': bench_timestamp,
+}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print("== %s ==" % name)
+        BENCHMARKS[name]()
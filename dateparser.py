@@ -18,11 +18,21 @@ If you write "01-06" it suggests June 1st or January 6th depending on your langu
 MAKE LOT OF TESTS
 '''
 import calendar
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as fixed_timezone, MAXYEAR
 from dateutil.relativedelta import relativedelta
-import pytz
 import locale as lc
 import json
+import os
+import sys
+import pickle
+import hashlib
+import threading
+import functools
+import contextlib
+from collections import namedtuple, OrderedDict, deque
+from array import array
+import itertools
+import bisect
 
 import unicodedata
 import re
@@ -56,62 +66,587 @@ HOURS = 'hours'
 HOURS_NO_MIN = 'hours-no-min'
 TIMEZONE = 'timezone'
 AM_PM = ['am', 'pm', 'a.m.', 'p.m.', 'a.m', 'p.m', 'am.', 'pm.', 'a', 'p']
+AM_PM_ENDINGS = tuple(AM_PM)
 ORDINALS = ['st', 'nd', 'rd', 'th']
 SEPARATORS = ['/', '-', '\\', '–']
+# longest phrase (in words) looked up in the glossary
+MAX_PHRASE_WORDS = 3
+# matches of a word that doesn't start any phrase, it is shared so it must not be modified
+NO_MATCHES = {}
+# type filters that parse looks up in the glossary
+COMPILED_FILTERS = [None, ['relative'], ['number'], ['month']]
+
+UTC = fixed_timezone.utc
 
 # TODO: 2 hours // 30 minutes (or mins)
 # TODO: 2h // 30m 
 # TODO: 1 wk or 1 week
 # TODO: 2 mo
 
-with open("glossary.json", "r") as read_file:
-    GLOSSARY = json.load(open("glossary.json", "r"))
+''' Glossary of a language compiled into hash maps, so lookups don't have to scan the entries.
+
+Entries keep the order they have in glossary.json, so when a target is repeated (i.e. "next month"
+is a special and a relative month) the first entry wins, like it did with list.index()
+
+Args:
+    entries (list): glossary entries of one language ({'target': ..., 'result': [...]})
+'''
+class Glossary:
+
+    def __init__(self, entries):
+        self.entries = entries
+        # target -> entries with that target (usually one)
+        self.by_target = {}
+        # type -> entries that have at least one result of that type
+        self.by_type = {}
+        for entry in entries:
+            self.by_target.setdefault(entry['target'], []).append(entry)
+            for kind in dict.fromkeys(r['type'] for r in entry['result']):
+                self.by_type.setdefault(kind, []).append(entry)
+        # type -> set of targets, used to find the position of a kind of word in a phrase
+        self.targets_by_type = {kind: {x['target'] for x in kind_entries} for kind, kind_entries in self.by_type.items()}
+        self._filtered = {}
+        self._tries = {}
+        self._first_words = {}
+        self._units = None
+
+    ''' Return the entries that have any of the types in filter, in glossary order '''
+    def entries_of(self, filter=None):
+        if filter is None:
+            return self.entries
+        key = tuple(filter)
+        entries = self._filtered.get(key)
+        if entries is None:
+            entries = [x for x in self.entries if any(r['type'] in filter for r in x['result'])]
+            self._filtered[key] = entries
+        return entries
+
+    ''' Build the tries used by parse, so they can be saved in a snapshot '''
+    def compile(self):
+        for filter in COMPILED_FILTERS:
+            self.trie_of(filter)
+        self.units()
+        return self
+
+    ''' Return the set of targets that have a result of type kind '''
+    def targets_of(self, kind):
+        return self.targets_by_type.get(kind, set())
+
+    ''' Return the first entry whose target is exactly text (and has any of the types in filter) '''
+    def lookup(self, text, filter=None):
+        entries = self.by_target.get(text)
+        if entries is None:
+            return None
+        if filter is None:
+            return entries[0]
+        for entry in entries:
+            if any(r['type'] in filter for r in entry['result']):
+                return entry
+        return None
+
+    ''' Return the set of first words of the targets that have a result of type kind '''
+    def first_words_of(self, kind):
+        words = self._first_words.get(kind)
+        if words is None:
+            words = self._first_words[kind] = {target.split(' ')[0] for target in self.targets_of(kind)}
+        return words
+
+    ''' Return the table of units (the letters of "2mo", "3d", "6mins") and the relative word they mean.
+
+    It has the relative targets of a single word and every prefix of at least 3 characters that
+    words_to_datepart resolves with the relative filter, i.e. {'d': 'days', 'mo': 'months', 'min': 'minutes'}
+    '''
+    def units(self):
+        if self._units is None:
+            units = {}
+            pending = [('', self.trie_of(['relative']))]
+            while pending:
+                prefix, node = pending.pop()
+                if len(prefix) >= 3 and not node.ambiguous:
+                    units[prefix] = node.entry['result'][0]['value']
+                for char, child in node.children.items():
+                    if char != ' ':
+                        pending.append((prefix + char, child))
+            # exact targets win over prefixes, the first entry of a repeated target wins
+            for entry in reversed(self.entries_of(['relative'])):
+                if ' ' not in entry['target']:
+                    units[entry['target']] = entry['result'][0]['value']
+            self._units = units
+        return self._units
+
+    ''' Return the prefix trie of the entries that have any of the types in filter '''
+    def trie_of(self, filter=None):
+        key = None if filter is None else tuple(filter)
+        trie = self._tries.get(key)
+        if trie is None:
+            trie = self._tries[key] = build_trie(self.entries_of(filter))
+        return trie
+
+    ''' Return the entry whose target starts with text if all of those targets mean the same '''
+    def lookup_prefix(self, text, filter=None):
+        node = self.trie_of(filter).find(text)
+        if node is None or node.ambiguous:
+            return None
+        return node.entry
+
+    ''' Return the entries whose target starts with text, in glossary order '''
+    def complete(self, text, filter=None):
+        node = self.trie_of(filter).find(text)
+        if node is None:
+            return []
+        return [entry for _, entry in sorted(node.terminals(), key=lambda x: x[0])]
+
+    ''' Find the phrases of up to max_size words that are in the glossary, in one pass over words.
+
+    From every word it walks the trie through the next words (joined by a space), so the 1, 2 and 3 words
+    phrases that start in that word are found with a single walk. A phrase matches like in words_to_datepart:
+    exactly or as an unambiguous prefix of at least 3 characters.
+    Args:
+        words (list): words of the text
+        max_size (int): max number of words of a phrase
+    Returns:
+        list: for each word, a dict {size: entry} of the phrases that start in it
+    '''
+    def match_phrases(self, words, max_size=MAX_PHRASE_WORDS):
+        root = self.trie_of()
+        matches = []
+        for i in range(len(words)):
+            # most words don't start a phrase, they share an empty dict
+            found = NO_MATCHES
+            node = root
+            length = 0
+            for size in range(1, min(max_size, len(words) - i) + 1):
+                if size > 1:
+                    node = node.children.get(' ')
+                    if node is None:
+                        break
+                    length += 1
+                word = words[i + size - 1]
+                node = node.find(word)
+                if node is None:
+                    break
+                length += len(word)
+                if node.terminal is not None:
+                    entry = node.terminal[1]
+                elif length >= 3 and not node.ambiguous:
+                    entry = node.entry
+                else:
+                    continue
+                if found is NO_MATCHES:
+                    found = {}
+                found[size] = entry
+            matches.append(found)
+        return matches
+
+
+''' Node of a prefix trie of glossary targets.
+
+Every node knows the first entry (in glossary order) of the targets below it and whether all of them
+have the same result, so an abbreviation is resolved by walking its characters.
+'''
+class TrieNode:
+    __slots__ = ('children', 'entry', 'ambiguous', 'terminal')
+
+    def __init__(self):
+        self.children = {}
+        self.entry = None
+        self.ambiguous = False
+        # (position in glossary, entry) of the target that ends in this node
+        self.terminal = None
+
+    # a plain tuple as state makes snapshots load twice as fast as the default state of __slots__
+    def __getstate__(self):
+        return (self.children, self.entry, self.ambiguous, self.terminal)
+
+    def __setstate__(self, state):
+        self.children, self.entry, self.ambiguous, self.terminal = state
+
+    ''' Return the node reached by text or None if no target starts with it '''
+    def find(self, text):
+        node = self
+        for char in text:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    ''' Return the node reached by size tokens from start joined by a space, or None '''
+    def find_words(self, tokens, start, size):
+        node = self
+        for i in range(start, start + size):
+            if i > start:
+                node = node.children.get(' ')
+                if node is None:
+                    return None
+            node = node.find(tokens[i].text)
+            if node is None:
+                return None
+        return node
+
+    ''' Yield (position, entry) of every target that ends in this node or below '''
+    def terminals(self):
+        pending = [self]
+        while pending:
+            node = pending.pop()
+            if node.terminal is not None:
+                yield node.terminal
+            pending.extend(node.children.values())
+
+
+''' Build a prefix trie of the targets of entries.
+
+A repeated target only counts with its first entry, like list.index() did.
+Args:
+    entries (list): glossary entries in glossary order
+Returns:
+    TrieNode: root of the trie
+'''
+def build_trie(entries):
+    root = TrieNode()
+    for position, entry in enumerate(entries):
+        node = root.find(entry['target'])
+        if node is not None and node.terminal is not None:
+            continue
+        node = root
+        for char in entry['target']:
+            node = node.children.setdefault(char, TrieNode())
+            if node.entry is None:
+                node.entry = entry
+            elif node.entry['result'] != entry['result']:
+                node.ambiguous = True
+        node.terminal = (position, entry)
+    return root
+
+
+GLOSSARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'glossary.json')
+# compiled glossaries are saved next to the module (one file per language), so processes don't have to build them again
+SNAPSHOT_DIR = os.path.dirname(os.path.abspath(__file__))
+# change it when Glossary or TrieNode change, so old snapshots are built again
+SNAPSHOT_VERSION = 3
+
+
+''' Read a snapshot of compiled glossaries, None if it doesn't exist or it can't be used '''
+def read_snapshot(snapshot_path):
+    if snapshot_path is None:
+        return None
+    try:
+        with open(snapshot_path, 'rb') as read_file:
+            snapshot = pickle.load(read_file)
+    # a snapshot from another version of this module can fail in many ways, it is built again
+    except Exception:
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+''' Write a snapshot of compiled glossaries. It isn't an error if the directory is read only '''
+def write_snapshot(snapshot_path, snapshot):
+    if snapshot_path is None:
+        return
+    # write to a temporary file and then rename it, so other processes never read half a snapshot
+    temp_path = '%s.%d.tmp' % (snapshot_path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as write_file:
+            pickle.dump(snapshot, write_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, snapshot_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+# glossary.json files already read, path -> GlossaryFile of its last modification time
+GLOSSARY_FILES = {}
+
+''' Content of a glossary.json, it is parsed only once (and only if a language has to be compiled) for all the
+languages that are loaded from it
+Args:
+    mtime (int): modification time of the file when it was read
+    sha256 (string): digest of the content
+    data (bytes): content, until it is parsed
+'''
+class GlossaryFile:
+
+    def __init__(self, mtime, sha256, data):
+        self.mtime = mtime
+        self.sha256 = sha256
+        self.data = data
+        self.languages = None
+
+    ''' Return the entries of a language, as they are in the file '''
+    def entries(self, language):
+        if self.languages is None:
+            self.languages = json.loads(self.data)
+            self.data = None
+        return self.languages[language]
+
+''' Return the GlossaryFile of path, it is read again only if its modification time changed '''
+def read_glossary_file(path, mtime):
+    glossary_file = GLOSSARY_FILES.get(path)
+    if glossary_file is None or glossary_file.mtime != mtime:
+        with open(path, 'rb') as read_file:
+            data = read_file.read()
+        glossary_file = GLOSSARY_FILES[path] = GlossaryFile(mtime, hashlib.sha256(data).hexdigest(), data)
+    return glossary_file
+
+''' Load the compiled glossary of a language.
+
+The snapshot of the language is used while glossary.json keeps its modification time, or its content
+(i.e. a checkout touched the file but didn't change it). Otherwise glossary.json is parsed (once for all the
+languages, see read_glossary_file), only that language is compiled and its snapshot is saved again.
+Args:
+    language (string): language of the glossary
+    path (string): path of glossary.json
+    snapshot_dir (string): directory of the snapshots, None to always compile the glossary
+Returns:
+    Glossary: compiled glossary of the language
+'''
+def load_glossary(language='en', path=GLOSSARY_PATH, snapshot_dir=SNAPSHOT_DIR):
+    snapshot_path = None
+    if snapshot_dir is not None:
+        snapshot_path = os.path.join(snapshot_dir, 'glossary.%s.pickle' % language)
+    mtime = os.stat(path).st_mtime_ns
+    snapshot = read_snapshot(snapshot_path)
+    if snapshot is not None and snapshot['mtime'] == mtime:
+        return snapshot['glossary']
+
+    glossary_file = read_glossary_file(path, mtime)
+    digest = glossary_file.sha256
+    if snapshot is not None and snapshot['sha256'] == digest:
+        glossary = snapshot['glossary']
+    else:
+        glossary = Glossary(glossary_file.entries(language)).compile()
+
+    write_snapshot(snapshot_path, {'version': SNAPSHOT_VERSION, 'mtime': mtime, 'sha256': digest, 'glossary': glossary})
+    return glossary
 
 
-'''Return text without accents (á, ä, â, ñ, ç) and in lowercase.'''
+# compiled glossaries of the languages used until now
+COMPILED_GLOSSARY = {}
+GLOSSARY_LOCK = threading.Lock()
+
+''' Return the compiled glossary of a language, it is loaded only the first time it is requested '''
+def get_glossary(language='en'):
+    glossary = COMPILED_GLOSSARY.get(language)
+    if glossary is None:
+        with GLOSSARY_LOCK:
+            glossary = COMPILED_GLOSSARY.get(language)
+            if glossary is None:
+                glossary = COMPILED_GLOSSARY[language] = load_glossary(language)
+    return glossary
+
+
+''' Entries of the glossary of each language, as they are in glossary.json. Languages are loaded on first use '''
+class LazyGlossary(dict):
+
+    def __missing__(self, language):
+        entries = self[language] = get_glossary(language).entries
+        return entries
+
+
+GLOSSARY = LazyGlossary()
+
+
+'''Return text without accents (á, ä, â, ñ, ç) and in lowercase.
+
+Most texts are ASCII and only need lower(), the words that aren't are stripped of their accents once
+(strip_accents is cached), the same word is in many texts (mañana, miércoles).
+'''
 def normalize(input_str):
-    nfkd_form = unicodedata.normalize('NFKD', input_str)
-    return u"".join([c for c in nfkd_form if not unicodedata.combining(c)]).lower()
-
-
-def find_pos_in_glossary(phrase, kind, language="en"):
-    glossary = GLOSSARY[language]
-    phrase = phrase.split(" ")
-    kind_words = [x['target'] for x in glossary if kind in [y['type'] for y in x['result']]]
-    for size in range(3, 0, -1):
-        formatted_phrase = []
-        for i in range(len(phrase) - size + 1):
-            formatted_phrase.append(' '.join(phrase[i:i+size]))
+    if input_str.isascii():
+        return input_str.lower()
+    return ' '.join([x.lower() if x.isascii() else strip_accents(x) for x in input_str.split(' ')])
+
+''' Return a non-ASCII word without accents and in lowercase, the result is interned '''
+@functools.lru_cache(maxsize=4096)
+def strip_accents(word):
+    nfkd_form = unicodedata.normalize('NFKD', word)
+    return sys.intern(u"".join([c for c in nfkd_form if not unicodedata.combining(c)]).lower())
+
+
+# kinds of token
+NUMBER_TOKEN = 'number'
+WORD_TOKEN = 'word'
+
+# a number followed by a unit (1w, 2mo, 3d, 4h, 5m, 6mins)
+NUMBER_UNIT_PATTERN = re.compile(r'(\d+)([^\W\d_]+)')
+
+# kinds of the words of find_date_parts that have numbers, in the order they are checked (a word is
+# separated only if it isn't an ordinal nor a time): 1st, 10:30pm, q3, 2024-05-02 (the first separator is kept)
+ORDINAL_WORD = 'ordinal'
+TIME_WORD = 'time'
+QUARTER_WORD = 'quarter'
+SEPARATED_WORD = 'separated'
+NUMERIC_WORD_KINDS = re.compile(
+    r'(?P<ordinal>(?P<day>\d+)(?:st|nd|rd|th))'
+    r'|(?P<time>(?P<hour>\d+)(?=[:ap])(?::(?P<minute>\d+)(?::(?P<second>\d+))?)?(?P<am_pm>[ap]\.?m\.?|[ap])?)'
+    r'|(?P<quarter>q\d+)'
+    r'|(?P<separated>(?!\d.*(?:st|nd|rd|th)$)(?!.*(?:[ap]\.?m\.?|[ap])$)[^:/\\\-–]*(?P<separator>[/\\\-–])[^:]*)')
+
+''' A word of the text to parse.
+
+Tokens are created once per text and the stages of parse mark them as used instead of
+rebuilding the list of words.
+Args:
+    text (string): the word (a relative word like "months" when it comes from "2mo")
+    start (int): position of the word in the normalized text
+    end (int): position after the word in the normalized text
+    kind (string): NUMBER_TOKEN if the word is made only of digits, WORD_TOKEN otherwise
+    value (int): value of a number token, or of a number word ("two") in a relative phrase
+'''
+class Token:
+    __slots__ = ('text', 'start', 'end', 'kind', 'value', 'used')
+
+    def __init__(self, text, start, end, kind=WORD_TOKEN, value=None):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.kind = kind
+        self.value = value
+        # True when the word was already consumed by a phrase, a timezone or an am/pm
+        self.used = False
+
+    @property
+    def span(self):
+        return (self.start, self.end)
+
+    def __repr__(self):
+        return 'Token(%r, %d, %d)' % (self.text, self.start, self.end)
+
+
+''' Split a normalized text into tokens.
+
+Numbers followed by a relative word (1w, 2mo, 3d, 4h, 5m, 6mins) are split into a number token and
+a relative token, i.e. "2mo" -> "2", "months"
+Args:
+    text (string): normalized text
+    language (string): language of the text
+Returns:
+    list: list of Token
+'''
+def tokenize(text, language='en'):
+    units = get_glossary(language).units()
+    tokens = []
+    end = -1
+    for word in text.split(' '):
+        start = end + 1
+        end = start + len(word)
+        # repeated spaces
+        if not word:
+            continue
+        if word.isdigit():
+            tokens.append(Token(word, start, end, NUMBER_TOKEN, int(word)))
+            continue
+
+        number_unit = NUMBER_UNIT_PATTERN.fullmatch(word)
+        if number_unit is not None and number_unit.group(2) in units and not word.endswith(AM_PM_ENDINGS):
+            number = number_unit.group(1)
+            split = start + len(number)
+            tokens.append(Token(number, start, split, NUMBER_TOKEN, int(number)))
+            tokens.append(Token(units[number_unit.group(2)], split, end))
+            continue
+
+        tokens.append(Token(word, start, end))
+    return tokens
+
+
+''' Return the position of the first of the last size tokens that aren't used, or None if there are less '''
+def find_last_unused(tokens, size):
+    for i in reversed(range(len(tokens))):
+        if not tokens[i].used:
+            size -= 1
+            if size == 0:
+                return i
+    return None
+
+''' Return the position of the first phrase (of 3 words, then 2 words, then 1 word) of a kind '''
+def find_pos_in_glossary(tokens, kind, language="en"):
+    glossary = get_glossary(language)
+    kind_words = glossary.targets_of(kind)
+    first_words = glossary.first_words_of(kind)
+    root = glossary.trie_of()
+    for size in range(MAX_PHRASE_WORDS, 0, -1):
         # stop looking at len(words) - size, so if there are 10 words you can only look up to 8th word for a 3 words prhase
-        for i, word in enumerate(formatted_phrase):
-            if word in kind_words:
+        for i in range(len(tokens) - size + 1):
+            if tokens[i].text not in first_words:
+                continue
+            node = root.find_words(tokens, i, size)
+            if node is not None and node.terminal is not None and node.terminal[1]['target'] in kind_words:
                 return i
     return None
 
-def find_exact_in_glossary(text, kind, language="en"):
-    words = text.split(" ")
-    glossary = GLOSSARY[language]
-    kind_words = [x['target'] for x in glossary if kind in [y['type'] for y in x['result']]]
-    for pos, word in enumerate(words):
-        if word in kind_words:
+''' Return the position of the first word of a kind '''
+def find_exact_in_glossary(tokens, kind, language="en"):
+    kind_words = get_glossary(language).targets_of(kind)
+    for pos, token in enumerate(tokens):
+        if token.text in kind_words:
             return pos
     
     return None
 
-'''Return the position of month and year in locale.
+# position of (month, day) in the short date of a locale. They are the same that strftime('%x') gives, so
+# parse doesn't have to change the locale of the process to know them
+MONTH_DAY = (0, 1)
+DAY_MONTH = (1, 0)
+YEAR_MONTH_DAY = (1, 2)
+LOCALE_MONTHDATE = {
+    'C': MONTH_DAY, 'POSIX': MONTH_DAY,
+    'en_US': MONTH_DAY, 'en_PH': MONTH_DAY, 'es_US': MONTH_DAY,
+    'en_GB': DAY_MONTH, 'en_AU': DAY_MONTH, 'en_NZ': DAY_MONTH, 'en_IE': DAY_MONTH, 'en_IN': DAY_MONTH,
+    'es_ES': DAY_MONTH, 'es_AR': DAY_MONTH, 'es_MX': DAY_MONTH, 'es_CO': DAY_MONTH, 'es_CL': DAY_MONTH,
+    'es_PE': DAY_MONTH, 'es_UY': DAY_MONTH, 'es_VE': DAY_MONTH, 'es_EC': DAY_MONTH, 'es_BO': DAY_MONTH,
+    'es_PY': DAY_MONTH, 'pt_BR': DAY_MONTH, 'pt_PT': DAY_MONTH, 'fr_FR': DAY_MONTH, 'fr_BE': DAY_MONTH,
+    'fr_CH': DAY_MONTH, 'de_DE': DAY_MONTH, 'de_AT': DAY_MONTH, 'de_CH': DAY_MONTH, 'it_IT': DAY_MONTH,
+    'nl_NL': DAY_MONTH, 'pl_PL': DAY_MONTH, 'ru_RU': DAY_MONTH, 'tr_TR': DAY_MONTH, 'el_GR': DAY_MONTH,
+    'ja_JP': YEAR_MONTH_DAY, 'zh_CN': YEAR_MONTH_DAY, 'ko_KR': YEAR_MONTH_DAY, 'hu_HU': YEAR_MONTH_DAY,
+    'sv_SE': YEAR_MONTH_DAY, 'lt_LT': YEAR_MONTH_DAY,
+}
+# locales that aren't in the table are probed once and kept here
+PROBED_MONTHDATE = {}
+LOCALE_LOCK = threading.Lock()
+
+'''Return the position of month and day in locale.
+
+Common locales are in LOCALE_MONTHDATE, any other locale is probed once with strftime('%x').
+Args:
+    locale (string): locale, i.e. en_US, en_GB.UTF-8 or es-AR
+Returns:
+    (int, int): position of month and day in locale
+'''
+def get_locale_monthdate(locale):
+    monthdate = PROBED_MONTHDATE.get(locale)
+    if monthdate is None:
+        # en_GB.UTF-8, en_GB@euro or en-GB are the same than en_GB
+        name = locale.split('.')[0].split('@')[0].replace('-', '_')
+        monthdate = LOCALE_MONTHDATE.get(name)
+        if monthdate is None:
+            monthdate = probe_locale_monthdate(locale)
+        PROBED_MONTHDATE[locale] = monthdate
+    return monthdate
+
+'''Return the position of month and day in locale, formatting a date with the locale.
 
 This should be done with locale.nl_langinfo but isn't available on Windows.
+It changes the locale of the process while it formats, so it is done with a lock and the previous
+locale is restored.
 Args:
     locale (string): locale
 Returns:
-    (int, int): position of month and year in locale
+    (int, int): position of month and day in locale
 '''
-def get_locale_monthdate(locale):
-    lc.setlocale(lc.LC_ALL, locale)
+def probe_locale_monthdate(locale):
     MONTH = 8
     DAY = 6
     test_date = datetime(2023,MONTH,DAY)
-    test = test_date.strftime('%x')
+    with LOCALE_LOCK:
+        previous = lc.setlocale(lc.LC_TIME)
+        try:
+            lc.setlocale(lc.LC_TIME, locale)
+            test = test_date.strftime('%x')
+        finally:
+            lc.setlocale(lc.LC_TIME, previous)
     separator = [x for x in test if not x.isdigit()][0]
     date_array = test.split(separator)
     day = None
@@ -168,6 +703,138 @@ def can_be_minute(minute):
 
 
 
+''' Return a naive datetime in a timezone (pytz or any tzinfo).
+
+Ambiguous and nonexistent times get the first offset (like fold=0 of PEP 495), so pytz and zoneinfo
+give the same instant.
+'''
+def localize(date, timezone):
+    if timezone is None:
+        return date
+    if hasattr(timezone, 'localize'):
+        import pytz
+        try:
+            return timezone.localize(date, is_dst=None)
+        except pytz.AmbiguousTimeError:
+            return timezone.localize(date, is_dst=True)
+        except pytz.NonExistentTimeError:
+            return timezone.localize(date, is_dst=False)
+    return date.replace(tzinfo=timezone)
+
+''' pytz keeps the offset of a datetime after adding days or changing its hour, so this decorator
+gives the result the offset it has in its timezone (zoneinfo datetimes are already right)
+'''
+def fix_offset(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        result = function(*args, **kwargs)
+        if result is not None and hasattr(result.tzinfo, 'localize'):
+            result = localize(result.replace(tzinfo=None), result.tzinfo)
+        return result
+    return wrapper
+
+
+MONTH_DAYS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+# the Gregorian calendar repeats every 400 years (146097 days, exactly 20871 weeks)
+CYCLE_YEARS = 400
+
+''' Return the weekday of the first day and the number of days of every month of a 400-year cycle, in two arrays of
+bytes indexed by month_index (years 1 to 400, every other cycle is the same)
+'''
+def build_calendar_table():
+    first_weekdays = array('b')
+    lengths = array('b')
+    # 0001-01-01 was Monday
+    weekday = 0
+    for year in range(1, CYCLE_YEARS + 1):
+        for month in range(1, 13):
+            days = 29 if month == 2 and calendar.isleap(year) else MONTH_DAYS[month - 1]
+            first_weekdays.append(weekday)
+            lengths.append(days)
+            weekday = (weekday + days) % 7
+    return first_weekdays, lengths
+
+FIRST_WEEKDAYS, MONTH_LENGTHS = build_calendar_table()
+
+''' Return the position of a month in the calendar table '''
+def month_index(year, month):
+    return (year - 1) % CYCLE_YEARS * 12 + month - 1
+
+''' Return the weekday (0 for Monday) of a date without building a datetime '''
+def weekday_of(year, month, day):
+    return (FIRST_WEEKDAYS[month_index(year, month)] + day - 1) % 7
+
+def month_days(year, month):
+    return MONTH_LENGTHS[month_index(year, month)]
+
+''' Return a date plus some months like relativedelta(months=months) (a day that the month doesn't have is its last
+day), without building a datetime. It raises ValueError after year 9999, like datetime.
+'''
+def add_months(year, month, day, months):
+    index = year * 12 + month - 1 + months
+    year, month = index // 12, index % 12 + 1
+    if year > MAXYEAR:
+        raise ValueError("year %d is out of range" % year)
+    return year, month, min(day, month_days(year, month))
+
+''' Return the month indices (of two 400-year cycles) where a search of find_weekday_date can stop, as sorted lists:
+- by (step, chain, weekday): months that start on weekday
+- by (step, chain, day): months shorter than day (29, 30 or 31), where the day becomes the last day of the month
+The chain is 0 when advancing a month at a time (step 1), or the month - 1 when advancing a year (step 12)
+'''
+def build_weekday_index():
+    starts = {}
+    shorts = {}
+    for index, (weekday, length) in enumerate(zip(FIRST_WEEKDAYS, MONTH_LENGTHS)):
+        for step, chain in [(1, 0), (12, index % 12)]:
+            starts.setdefault((step, chain, weekday), []).append(index)
+            for day in range(length + 1, 32):
+                shorts.setdefault((step, chain, day), []).append(index)
+    # the second cycle, so a search from any month of the first one finds a month ahead
+    for indices in itertools.chain(starts.values(), shorts.values()):
+        indices.extend([x + CYCLE_YEARS * 12 for x in indices])
+    return starts, shorts
+
+WEEKDAY_STARTS, SHORT_MONTHS = build_weekday_index()
+
+''' Find the first date on a weekday, from a date and advancing a month or a year at a time, like adding
+relativedelta(months=1) or relativedelta(years=1) (a day that the month doesn't have is its last day, and it stays so).
+
+The day is on weekday in the first month that starts on (weekday - day + 1) % 7, so it is a binary search in
+WEEKDAY_STARTS, unless a shorter month changes the day before (at most 3 times: 31st, 30th, 29th), without
+building any datetime or looking at the months in between.
+Args:
+    year, month, day: first date
+    weekday: 0 for Monday, 1 for Tuesday, ..., 6 for Sunday
+    step: months to advance, 1 or 12
+    stop_year: last year to look at (the first date is returned even if it is after it)
+Returns:
+    tuple: (year, month, day) of the first date on weekday, or None if there isn't one until stop_year
+'''
+def find_weekday_date(year, month, day, weekday, step, stop_year):
+    chain = 0 if step == 1 else month - 1
+    start = year * 12 + month - 1
+    # steps until the first month after stop_year, that is looked at too
+    stop = max(0, -(((stop_year + 1) * 12 - start) // -step))
+    position = month_index(year, month)
+    steps = 0
+    while steps <= stop:
+        starts = WEEKDAY_STARTS[step, chain, (weekday - day + 1) % 7]
+        found = starts[bisect.bisect_left(starts, position)]
+        shorts = SHORT_MONTHS.get((step, chain, day), ())
+        short = bisect.bisect_left(shorts, position)
+        if short == len(shorts) or found < shorts[short]:
+            steps += (found - position) // step
+            break
+        steps += (shorts[short] - position) // step
+        position = shorts[short] % (CYCLE_YEARS * 12)
+        day = MONTH_LENGTHS[position]
+
+    year, month = divmod(start + min(steps, stop) * step, 12)
+    if year > MAXYEAR:
+        raise ValueError("year %d is out of range" % year)
+    return (year, month + 1, day) if steps <= stop else None
+
 ''' Return the next weekday after the input date
 
 Args:
@@ -212,8 +879,12 @@ Args:
     locale_timezone (timezone): timezone of the base_date
     timezone (timezone): timezone of the result
 Returns:
-    datetime: future datetime
+    datetime: future datetime, or None if there isn't one: a complete date that doesn't exist (31st April 2025) or
+        is past, or a weekday after the last one of the year (or of the month in a year), even in year 9999
+Raises:
+    ValueError: if the date it looks for is after year 9999
 '''
+@fix_offset
 def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None, months=0, 
     year=None, years=0, hour=None, hours=0, minute=None, minutes=0, second=None, seconds=0, 
     quarter=None, timezone=None, special=None, base_date=None, locale_timezone=None,
@@ -289,9 +960,9 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
         elif special == WEEKEND:
             # if it is weekend (Saturday or Sunday), add two days to current day so it is on a laborable day
             if base_date.day >= 5:
-                base_date = base_date + relativedelta(days=2)
+                base_date = base_date + timedelta(days=2)
             # calculate next Saturday
-            result = next_weekday(base_date, 5)
+            result = base_date + timedelta(days=(5 - base_date.weekday()) % 7)
             return result.replace(hour=hour, minute=minute, second=second, microsecond=0)
         elif special == TONIGHT:
             if base_date.hour < 20:
@@ -308,18 +979,21 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
             return (base_date + timedelta(days=1)).replace(hour=hour, minute=minute, second=second, microsecond=0)
         elif special == NEXT_WEEK:
             # next Monday, if today is Monday next week Monday (today + 7 days)
-            result = next_weekday(base_date, 0) if base_weekday > 0 else base_date + relativedelta(days=7)
+            result = base_date + timedelta(days=7 - base_weekday)
             return result.replace(hour=hour, minute=minute, second=second, microsecond=0)
         elif special == NEXT_MONTH:
-            result = base_date.replace(day=1) + relativedelta(months=1)
-            return result.replace(hour=hour, minute=minute, second=second, microsecond=0)
+            next_year, next_month, _ = add_months(base_year, base_month, 1, 1)
+            return base_date.replace(year=next_year, month=next_month, day=1, hour=hour, minute=minute, second=second,
+                microsecond=0)
         elif special == NEXT_QUARTER:
             # this quarter start date + 3 months
-            result = base_date.replace(month=base_month // 3 * 3  + 1, day=1) + relativedelta(months=3)
-            return result.replace(hour=hour, minute=minute, second=second, microsecond=0)
+            result = base_date.replace(month=base_month // 3 * 3  + 1, day=1)
+            next_year, next_month, _ = add_months(base_year, result.month, 1, 3)
+            return result.replace(year=next_year, month=next_month, hour=hour, minute=minute, second=second,
+                microsecond=0)
         elif special == NEXT_YEAR:
-            result = base_date.replace(month=1, day=1) + relativedelta(years=1)
-            return result.replace(hour=hour, minute=minute, second=second, microsecond=0)
+            return base_date.replace(year=base_year + 1, month=1, day=1, hour=hour, minute=minute, second=second,
+                microsecond=0)
 
     # if I have relative quarters I translate it to relative months (get start of this quarter and
     # add quarters * 3)
@@ -333,7 +1007,8 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
         if weekday is not None:
         # only weekday, just look for next weekday
             if day_number is None and month is None and year is None:
-                return next_weekday(base_date + relativedelta(days=1), weekday).replace(hour=hour, minute=minute, second=second, microsecond=0)
+                return (base_date + timedelta(days=(weekday - base_weekday - 1) % 7 + 1)).replace(hour=hour, minute=minute,
+                    second=second, microsecond=0)
             
             # if day number, month and year are present have to check if that date has the same weekday and if it is in the future
             # i.e. 15th January 2024 is Monday, so if you ask for Monday 2024-01-15 it returns that day, but if you as for 
@@ -363,33 +1038,21 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
                 try_date = datetime(start_year, start_month, day_number, hour=hour, minute=minute, second=second)
 
                 # if the date is before the base date, it has to be the next month (or next year if month is not blank)
+                step = 1 if month is None else 12
+                start = (start_year, start_month, day_number)
                 if try_date < base_date:
-                    if month is None:
-                        try_date = try_date + relativedelta(months=1)
-                    else:
-                        try_date = try_date + relativedelta(years=1)
+                    start = add_months(start_year, start_month, day_number, step)
                 
                 stop_year = 99999
                 if year is not None:
                     stop_year = year
-                plus_months = 0
-                plus_years = 0
-
-                # if month is empty try month by month
-                if month is None:
-                    plus_months = 1
-                else:
-                    # if month is not empty try year by year
-                    plus_years = 1
 
-                # try advancing month or year until you find the weekday or year is ahead of input year            
-                while try_date.weekday() != weekday and stop_year >= try_date.year:
-                    try_date = try_date + relativedelta(months=plus_months, years=plus_years)
-                
-                if try_date.weekday() == weekday:
-                    return try_date
-                else:
+                # try advancing month by month if month is empty, or year by year if it isn't, until you find the
+                # weekday or year is ahead of input year
+                found = find_weekday_date(*start, weekday, step, stop_year)
+                if found is None:
                     return None
+                return try_date.replace(*found)
             
             # month but not day_number (and may be year)
             elif month is not None:
@@ -402,7 +1065,7 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
                         start_date = datetime(base_year, month, 1, hour, minute, second)
                         # if year is empty and month is before current month, it has to be same month next year
                         if start_date < base_date:
-                            start_date = start_date + relativedelta(years=1)
+                            start_date = start_date.replace(year=base_year + 1)
                 else:
                     # if year is present, it starts on 1st day of that month-year
                     start_date = datetime(year, month, 1, hour, minute, second)
@@ -415,34 +1078,35 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
                     elif start_date.year < base_date.year:
                         return None
                     
-                result = next_weekday(start_date, weekday)
+                start_year = start_date.year
+                days_ahead = (weekday - start_date.weekday()) % 7
 
-                if result.month == month:
-                    return result
+                if start_date.day + days_ahead <= month_days(start_year, month):
+                    return start_date + timedelta(days=days_ahead)
                 else:
                     # it is a weekday after the last weekday in that month, so it looks for the first weekday same month next year
                     if year is None:
-                        return next_weekday(start_date.replace(day=1) + relativedelta(years=1), weekday)
+                        return start_date.replace(year=start_year + 1, day=1) + timedelta(
+                            days=(weekday - weekday_of(start_year + 1, month, 1)) % 7)
                     # if it is a weekday after the last weekday in that month, and year is present, it returns None
                     else:
                         return None
 
             # only year
             elif year is not None:
-                start_date = base_date
+                # a year ahead starts on 1st January, the weekday is in its first week
                 if year > base_year:
-                    start_date = datetime(year, 1, 1, hour, minute, second)
+                    return datetime(year, 1, 1 + (weekday - weekday_of(year, 1, 1)) % 7, hour, minute, second)
                 elif year < base_year:
                     return None
-                elif weekday == start_date.weekday() and hour < start_date.hour:
-                    start_date = start_date + relativedelta(days=1)
-                
-                result = next_weekday(start_date, weekday)
-                if result.year == year:
-                    return result
-                else:
-                    # it is a weekday after last weekday on the year
+
+                days_ahead = (weekday - base_weekday) % 7
+                if days_ahead == 0 and hour < base_date.hour:
+                    days_ahead = 7
+                # it is a weekday after last weekday on the year
+                if base_month == 12 and base_date.day + days_ahead > 31:
                     return None
+                return base_date + timedelta(days=days_ahead)
         ### Here finished weekday is Not None ###
 
         # ********* weekday is blank *************
@@ -518,8 +1182,11 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
         # or if you are on 31st August 7 pm and you ask for 31st 5 pm, it will add a month and will get September 31st
         # so it has to add another month in order to get October 31st
         
-        first_day_temp = datetime(new_year, new_month, 1)
-        max_day = calendar.monthrange(first_day_temp.year, first_day_temp.month)[1]
+        # the month is looked up in the calendar table, temp_year, temp_month and temp_day is the date that is tried
+        if new_year > MAXYEAR:
+            raise ValueError("year %d is out of range" % new_year)
+        temp_year, temp_month, temp_day = new_year, new_month, 1
+        max_day = month_days(temp_year, temp_month)
             
         if max_day < day_number or (max_day == day_number and datetime(year, month, day_number, hour, minute, second) <= base_date):
             while True:
@@ -528,22 +1195,27 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
                 # Example: 6 pm and now is 8 pm, you have to add a day
                 if day_was_none and month_was_none and year_was_none:
                     plus_day = plus_day + 1
-                    first_day_temp = first_day_temp + relativedelta(days=1)    
-                    max_day = calendar.monthrange(first_day_temp.year, first_day_temp.month)[1]
+                    temp_day = temp_day + 1
+                    if temp_day > month_days(temp_year, temp_month):
+                        temp_year, temp_month, temp_day = add_months(temp_year, temp_month, 1, 1)
+                    max_day = month_days(temp_year, temp_month)
                 # if month is not present you can add a month
                 # Example: 30th of June and you ask for 31st, you have to add a month to get July
                 # Example: 31st August 8 pm and you ask for 31st 10 am, you have to add a monther to see if next month has 31
                 # Example: 31st December 8 pm and you ask for 31st 10 am, you have to add a month to see if next month (January next year) has 31
                 elif month_was_none:
                     plus_month = plus_month + 1
-                    first_day_temp = first_day_temp + relativedelta(months=1)    
-                    max_day = calendar.monthrange(first_day_temp.year, first_day_temp.month)[1]
+                    temp_year, temp_month, temp_day = add_months(temp_year, temp_month, temp_day, 1)
+                    max_day = month_days(temp_year, temp_month)
                 # if year is not present you can add a year
                 # Example: 15th March 2024 and you ask for 29th of February, you have to add year so you test if next year is leap
                 elif year_was_none:
                     plus_year = plus_year + 1
-                    first_day_temp = first_day_temp + relativedelta(years=1)
-                    max_day = calendar.monthrange(first_day_temp.year, first_day_temp.month)[1]
+                    temp_year, temp_month, temp_day = add_months(temp_year, temp_month, temp_day, 12)
+                    max_day = month_days(temp_year, temp_month)
+                # day, month and year are present, that date doesn't exist (31st April) or isn't in the future
+                else:
+                    return None
                 
                 if max_day >= day_number:
                     break
@@ -567,13 +1239,31 @@ def future_datetime(weekday=None, weeks=0, day_number=None, days=0, month=None,
         second = base_date.second
     
     # print(year, month, day_number, hour, minute, second, years, months, days, weeks, hours, minutes, seconds)
-    result = datetime(year, month, day_number, hour, minute, second, microsecond=0, tzinfo=timezone) + relativedelta(years=years, 
-        months=months, days=days, weeks=weeks, hours=hours, minutes=minutes, seconds=seconds)
+    # relative parts are added to the wall time, then it is put in the timezone
+    result = localize(datetime(year, month, day_number, hour, minute, second, microsecond=0) + relativedelta(years=years, 
+        months=months, days=days, weeks=weeks, hours=hours, minutes=minutes, seconds=seconds), timezone)
     if  result > base_date:
         return result
     else:
         return None
     
+# hour, minute or second of DateParts that is the one of the base date (i.e. "in 2 hours" keeps the minute)
+FROM_BASE = 'FROM_BASE'
+
+''' Parts of a date found in a text, before they are resolved against a base date.
+
+Fields are the arguments of future_datetime. hour, minute and second can be FROM_BASE, and when pm_if_past
+is True the hour (less than 12) is pm if the base date is already past it (i.e. "at 5" at 10am is 17:00).
+'''
+DateParts = namedtuple('DateParts', ['special', 'weekday', 'day_number', 'month', 'year', 'quarter',
+    'hour', 'minute', 'second', 'pm_if_past', 'years', 'quarters', 'months', 'weeks', 'days', 'hours', 'minutes',
+    'timezone'])
+
+# interpretations of the last texts, (text, language, locale, year of base date) -> (DateParts, timezones)
+INTERPRET_CACHE = OrderedDict()
+INTERPRET_CACHE_SIZE = 4096
+INTERPRET_LOCK = threading.Lock()
+
 ''' Try to convert a natural language text into a datetime.
 
 Args:
@@ -582,20 +1272,878 @@ Args:
     base_date: base date to calculate the future date. It should be always blank so it takes current datetime, but it is useful for testing
     locale_timezone: timezone of the base_date
     locale: locale of the base_date
+    cache: ResultCache to reuse the results of the same text in the same day, hour, minute or second
 Returns:
     datetime: future datetime or None if it can't parse
 '''
-def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_US"):
+def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_US", cache=None):
+    base_date, other_timezone = prepare_base_date(base_date, locale_timezone)
+    result = parse_timestamp(text, base_date, locale_timezone)
+    if result is not NOT_TIMESTAMP:
+        return result
+    parts = interpret(text, language, locale, base_date)
+    return resolve_with_cache(parts, base_date, locale_timezone, other_timezone, cache)
+
+# ISO 8601 timestamps: 2024-05-02, 2024-05-02 09:35, 2024-05-02T09:35:00.123+02:00
+ISO_TIMESTAMP_PATTERN = re.compile(r'\s*(\d{4})-(\d{2})-(\d{2})(?:[t ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,6})\d*)?)?'
+    r'\s*(z|[+-]\d{2}:?\d{2})?)?\s*', re.IGNORECASE)
+# RFC 2822 timestamps (e-mail and HTTP headers): Thu, 02 May 2024 09:35:00 +0000
+RFC_TIMESTAMP_PATTERN = re.compile(r'\s*(?:(mon|tue|wed|thu|fri|sat|sun),?\s+)?(\d{1,2})\s+'
+    r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+(\d{4})\s+(\d{2}):(\d{2})(?::(\d{2}))?'
+    r'(?:\s+([+-]\d{4}|gmt|ut|utc|z))?\s*', re.IGNORECASE)
+RFC_WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+RFC_MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+# result of parse_timestamp for a text that isn't a timestamp
+NOT_TIMESTAMP = 'NOT_TIMESTAMP'
+
+''' Parse an ISO 8601 or RFC 2822 timestamp without interpreting its words, the fast path of parse for
+machine-generated texts.
+
+Like any other date, the timestamp is in locale_timezone if it doesn't have an offset, at DEFAULT_HOUR if it
+doesn't have a time, and it must be after base_date. A timestamp with an offset (Z, GMT, +0000) is compared with
+a naive base_date in the local timezone. Unlike the words of other dates, the fraction of a second (.123456) is
+kept in the microseconds of the result.
+Args:
+    text: text to parse
+    base_date: base date, already in locale_timezone (like prepare_base_date returns it)
+    locale_timezone: timezone of the base_date
+Returns:
+    datetime: the timestamp, None if it is an invalid date or it isn't after base_date, or NOT_TIMESTAMP if the
+        text isn't a timestamp
+'''
+def parse_timestamp(text, base_date, locale_timezone=None):
+    match = ISO_TIMESTAMP_PATTERN.fullmatch(text)
+    if match is not None:
+        year, month, day, hour, minute, second, fraction, offset = match.groups()
+        weekday = None
+        month = int(month)
+    else:
+        match = RFC_TIMESTAMP_PATTERN.fullmatch(text)
+        if match is None:
+            return NOT_TIMESTAMP
+        weekday, day, month, year, hour, minute, second, offset = match.groups()
+        fraction = None
+        month = RFC_MONTHS.index(month.lower()) + 1
+
+    try:
+        result = datetime(int(year), month, int(day), DEFAULT_HOUR if hour is None else int(hour),
+            int(minute or 0), int(second or 0), int(fraction.ljust(6, '0')) if fraction else 0)
+    except ValueError:
+        return None
+    if weekday is not None and RFC_WEEKDAYS.index(weekday.lower()) != result.weekday():
+        return None
+
+    if offset is None:
+        result = localize(result, locale_timezone)
+    elif offset.lower() in ('z', 'gmt', 'ut', 'utc'):
+        result = result.replace(tzinfo=UTC)
+    else:
+        hours, minutes = int(offset[1:3]), int(offset[-2:])
+        if hours > 23 or minutes > 59:
+            return None
+        sign = -1 if offset[0] == '-' else 1
+        result = result.replace(tzinfo=fixed_timezone(sign * timedelta(hours=hours, minutes=minutes)))
+    if result.tzinfo is not None and base_date.tzinfo is None:
+        base_date = base_date.astimezone()
+    return result if result > base_date else None
+
+''' Return base_date (current datetime if it is None) in locale_timezone, and whether it was already in a timezone '''
+def prepare_base_date(base_date, locale_timezone):
+    if base_date is None:
+        base_date = datetime.now()
+
+    # the result is compared with base_date in another timezone
+    other_timezone = base_date.tzinfo is not None and locale_timezone is not None
+    if base_date.tzinfo is None and locale_timezone is not None:
+        base_date = localize(base_date, locale_timezone)
+    return base_date, other_timezone
+
+''' Resolve parts, through cache if it isn't None '''
+def resolve_with_cache(parts, base_date, locale_timezone, other_timezone, cache):
+    if cache is None or parts is None:
+        return resolve(parts, base_date, locale_timezone)
+    return cache.resolve(parts, base_date, locale_timezone, other_timezone or parts.timezone is not None)
+
+''' Parse many texts with the same base date, language and locale.
+
+The base date is set once for the whole batch, and every text is parsed once, however many times it
+is repeated (texts that are the same after normalize are the same text).
+Args:
+    texts: iterable of texts to parse
+    language, base_date, locale_timezone, locale, cache: like in parse
+    workers: number of processes that parse the texts, None to parse them in this process
+    batch_size: number of texts sent to a worker at once
+    errors: 'raise' to raise the errors of texts that can't be resolved (i.e. the 31st of a month that doesn't
+        have it), 'ignore' to return None for them
+Returns:
+    list: a datetime (or None) for every text, in the same order
+'''
+def parse_many(texts, language='en', base_date=None, locale_timezone=None, locale="en_US", cache=None,
+        workers=None, batch_size=1000, errors='raise'):
+    return list(parse_iter(texts, language, base_date, locale_timezone, locale, cache, workers=workers,
+        batch_size=batch_size, errors=errors))
+
+# errors of texts that are interpreted but can't be resolved (invalid dates, naive and aware datetimes)
+PARSE_ERRORS = (ValueError, TypeError, OverflowError)
+
+''' Like parse_many, but it yields every result as soon as its text is parsed, so texts can be streamed.
+
+Only the results of the last memo_size different texts are kept to answer repeated texts.
+'''
+def parse_iter(texts, language='en', base_date=None, locale_timezone=None, locale="en_US", cache=None, memo_size=65536,
+        workers=None, batch_size=1000, errors='raise'):
+    if workers:
+        yield from parse_in_workers(texts, language, base_date, locale_timezone, locale, cache, memo_size, workers,
+            batch_size, errors)
+        return
+
+    base_date, other_timezone = prepare_base_date(base_date, locale_timezone)
+    results = OrderedDict()
+    for text in texts:
+        key = normalize(text)
+        if key in results:
+            results.move_to_end(key)
+            yield results[key]
+            continue
+
+        try:
+            result = parse_timestamp(text, base_date, locale_timezone)
+            if result is NOT_TIMESTAMP:
+                result = resolve_with_cache(interpret(text, language, locale, base_date), base_date, locale_timezone,
+                    other_timezone, cache)
+        except PARSE_ERRORS:
+            if errors == 'raise':
+                raise
+            result = None
+        results[key] = result
+        if len(results) > memo_size:
+            results.popitem(last=False)
+        yield result
+
+''' Parse texts in a pool of processes, in batches of batch_size texts, and yield the results in order.
+
+Only 2 batches per worker are waiting at any time, so texts are read as they are needed. The cache isn't shared,
+every worker has its own ResultCache of the same size.
+'''
+def parse_in_workers(texts, language, base_date, locale_timezone, locale, cache, memo_size, workers, batch_size, errors):
+    from concurrent.futures import ProcessPoolExecutor
+
+    # every worker has the same base date
+    if base_date is None:
+        base_date = datetime.now()
+    cache_size = None if cache is None else cache.maxsize
+    texts = iter(texts)
+    executor = ProcessPoolExecutor(workers, initializer=init_worker,
+        initargs=(language, get_timezone_backend().name, cache_size))
+    try:
+        pending = deque()
+        while True:
+            while len(pending) < workers * 2:
+                batch = list(itertools.islice(texts, batch_size))
+                if not batch:
+                    break
+                pending.append(executor.submit(parse_batch, batch, language, base_date, locale_timezone, locale,
+                    memo_size, errors))
+            if not pending:
+                break
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+# ResultCache of a worker process of parse_in_workers
+WORKER_CACHE = None
+
+''' Load the glossary and the timezone index in a worker process, so batches don't pay for them '''
+def init_worker(language, backend_name, cache_size):
+    global WORKER_CACHE
+    if get_timezone_backend().name != backend_name:
+        set_timezone_backend(backend_name)
+    get_glossary(language)
+    find_timezone_names('utc')
+    WORKER_CACHE = None if cache_size is None else ResultCache(cache_size)
+
+''' Parse a batch of texts in a worker process '''
+def parse_batch(texts, language, base_date, locale_timezone, locale, memo_size, errors):
+    return list(parse_iter(texts, language, base_date, locale_timezone, locale, WORKER_CACHE, memo_size,
+        errors=errors))
+
+# words of a document for search, punctuation that can't be in a date splits them
+SEARCH_WORD_PATTERN = re.compile(r"[^\s,;!?()\[\]{}<>\"']+")
+# numbers, times and dates written with digits, i.e. 15th, 10:30, 5pm, 2024-05-02, q3
+NUMERIC_WORD_PATTERN = re.compile(r"(\d+)([:/\\\-–.]\d+)*(st|nd|rd|th|[ap]\.?(m\.?)?)?$|q[1-4]$")
+# types of glossary words that are a date by themselves (numbers and relative words need each other)
+SEARCH_DATE_TYPES = {'month', 'weekday', 'special', 'quarter', 'hour', 'hours-no-min', 'timezone'}
+# max number of words of an expression found by search
+MAX_SEARCH_WORDS = 6
+# kinds of the words of search: a date by itself, a number, am or pm, a relative word (days, weeks...) and
+# a short word that can be between them (at, of, on...)
+DATE_WORD = 'date'
+NUMBER_WORD = 'number'
+AM_PM_WORD = 'am_pm'
+RELATIVE_WORD = 'relative'
+GLUE_WORD = 'glue'
+MAX_GLUE_LENGTH = 4
+
+''' Find the date expressions in a long text (i.e. an email), scanning it once.
+
+Words that can be part of a date (glossary phrases, numbers, and a short word between them like "at") are
+grouped in runs (a comma doesn't break a run, a newline or the end of a sentence does), and in every run the
+longest phrases that parse are taken from left to right. Phrases are at most MAX_SEARCH_WORDS words long, so
+the time is linear in the length of the text. A phrase needs a word that is a date by itself (a month, a weekday,
+"tomorrow", a time like 10:30 or 5pm...) or a number with a relative word or am/pm ("in 2 days", "10 am"),
+so "3 apples" isn't a date.
+Args:
+    text: text to search
+    language, base_date, locale_timezone, locale, cache: like in parse
+Returns:
+    generator: ((start, end), matched text, datetime) of every date expression, in the order of the text
+'''
+def search(text, language='en', base_date=None, locale_timezone=None, locale="en_US", cache=None):
+    base_date, other_timezone = prepare_base_date(base_date, locale_timezone)
+    glossary = get_glossary(language)
+    units = glossary.units()
+
+    spans = []
+    words = []
+    for match in SEARCH_WORD_PATTERN.finditer(text):
+        start, end = match.span()
+        # a dot that ends a sentence isn't part of the word, the ones of "p.m." are
+        while end > start and text[end - 1] in '.:' and not text[start:end].lower().endswith(('a.m.', 'p.m.')):
+            end -= 1
+        if end > start:
+            spans.append((start, end))
+            words.append(normalize(text[start:end]))
+    matches = glossary.match_phrases(words)
+
+    kinds = []
+    for word, found in zip(words, matches):
+        numeric = NUMERIC_WORD_PATTERN.match(word)
+        unit = NUMBER_UNIT_PATTERN.fullmatch(word)
+        if numeric is not None:
+            kinds.append(NUMBER_WORD if numeric.group(0) == numeric.group(1) else DATE_WORD)
+        elif word in AM_PM and kinds and kinds[-1] == NUMBER_WORD:
+            kinds.append(AM_PM_WORD)
+        elif found:
+            types = {r['type'] for entry in found.values() for r in entry['result']}
+            kinds.append(DATE_WORD if types & SEARCH_DATE_TYPES else RELATIVE_WORD if 'relative' in types else NUMBER_WORD)
+        elif unit is not None and unit.group(2) in units:
+            kinds.append(DATE_WORD)
+        elif word.isalpha() and len(word) <= MAX_GLUE_LENGTH:
+            kinds.append(GLUE_WORD)
+        else:
+            kinds.append(None)
+
+    run = []
+    for position, kind in enumerate(kinds):
+        # a run ends at a word that isn't part of a date, or at a short word after another one or after a comma
+        if kind is None or (kind == GLUE_WORD and run and (kinds[run[-1]] == GLUE_WORD
+                or ',' in text[spans[run[-1]][1]:spans[position][0]])):
+            yield from search_run(text, run, spans, words, kinds, language, base_date, locale_timezone, locale,
+                other_timezone, cache)
+            run = []
+            if kind is None:
+                continue
+        run.append(position)
+        # or when a newline or the end of a sentence is after the word
+        gap = text[spans[position][1]:spans[position + 1][0]] if position + 1 < len(kinds) else '\n'
+        if '\n' in gap or any(x in gap for x in '.;!?'):
+            yield from search_run(text, run, spans, words, kinds, language, base_date, locale_timezone, locale,
+                other_timezone, cache)
+            run = []
+
+''' Yield the longest phrases that parse in a run of words of search, from left to right.
+
+Phrases don't start or end with a short word between dates, so "tomorrow and" is "tomorrow".
+'''
+def search_run(text, run, spans, words, kinds, language, base_date, locale_timezone, locale, other_timezone, cache):
+    i = 0
+    while i < len(run):
+        if kinds[run[i]] == GLUE_WORD:
+            i += 1
+            continue
+        for j in range(min(len(run), i + MAX_SEARCH_WORDS), i, -1):
+            result = search_phrase(run[i:j], words, kinds, language, base_date, locale_timezone, locale,
+                other_timezone, cache)
+            if result is not None:
+                # short words and numbers in letters at the end that don't change the date aren't part of it
+                # ("may 20th is a")
+                k = j
+                while k - 1 > i and (kinds[run[k - 1]] == GLUE_WORD
+                        or (kinds[run[k - 1]] == NUMBER_WORD and not words[run[k - 1]][0].isdigit())):
+                    k -= 1
+                    if search_phrase(run[i:k], words, kinds, language, base_date, locale_timezone, locale,
+                            other_timezone, cache) == result:
+                        j = k
+                start, end = spans[run[i]][0], spans[run[j - 1]][1]
+                yield (start, end), text[start:end], result
+                i = j
+                break
+        else:
+            i += 1
+
+''' Return the datetime of a phrase of search (the positions of its words), or None if it isn't a date '''
+def search_phrase(positions, words, kinds, language, base_date, locale_timezone, locale, other_timezone, cache):
+    used = {kinds[x] for x in positions}
+    if kinds[positions[-1]] == GLUE_WORD or (DATE_WORD not in used and not (NUMBER_WORD in used
+            and (RELATIVE_WORD in used or AM_PM_WORD in used))):
+        return None
+    phrase = ' '.join(words[x] for x in positions)
+    try:
+        return resolve_with_cache(interpret(phrase, language, locale, base_date), base_date, locale_timezone,
+            other_timezone, cache)
+    except PARSE_ERRORS:
+        return None
+
+''' Parse a batch of AsyncParser, it returns (datetime, None) or (None, error) for every text '''
+def parse_each(texts, language, base_date, locale_timezone, locale, cache):
+    if base_date is None:
+        base_date = datetime.now()
+    try:
+        return [(x, None) for x in parse_many(texts, language, base_date, locale_timezone, locale, cache)]
+    except PARSE_ERRORS:
+        # only the texts that raise the error get it
+        results = []
+        for text in texts:
+            try:
+                results.append((parse(text, language, base_date, locale_timezone, locale, cache), None))
+            except PARSE_ERRORS as error:
+                results.append((None, error))
+        return results
+
+''' Parse texts from asyncio tasks without blocking the event loop.
+
+The texts of the calls that arrive within window seconds (with the same language, base date, timezone and
+locale) are parsed together with a parse_many in executor, at most max_batch texts at once. When max_pending
+texts are waiting or being parsed, parse waits until there is room for another.
+
+    parser = AsyncParser()
+    date = await parser.parse('tomorrow 5pm', locale_timezone=tz)
+Args:
+    executor: concurrent.futures executor for the batches, the default executor of the loop if it is None.
+        cache can't be used with a ProcessPoolExecutor
+    window (float): seconds that a text waits for others to be parsed together
+    max_batch (int): max number of texts parsed at once
+    max_pending (int): max number of texts waiting or being parsed
+    timeout (float): seconds to wait for a result (TimeoutError), None to wait forever
+    cache: ResultCache used by the batches
+'''
+class AsyncParser:
+
+    def __init__(self, executor=None, window=0.002, max_batch=256, max_pending=4096, timeout=None, cache=None):
+        import asyncio
+
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.cache = cache
+        self.slots = asyncio.Semaphore(max_pending)
+        # (language, base_date, locale_timezone, locale) -> (texts, futures, timer)
+        self.batches = {}
+
+    ''' Like parse, but it is awaited. timeout is the one of the parser if it isn't set '''
+    async def parse(self, text, language='en', base_date=None, locale_timezone=None, locale="en_US", timeout=False):
+        import asyncio
+
+        timeout = self.timeout if timeout is False else timeout
+        key = (language, base_date, locale_timezone, locale)
+        return await asyncio.wait_for(self.parse_in_batch(text, key), timeout)
+
+    ''' Like suggest (it doesn't write anything), but it is awaited. Suggestions aren't batched, every call runs in executor '''
+    async def suggest(self, text, language='en', base_date=None, locale_timezone=None, locale="en_US", timeout=False):
+        import asyncio
+
+        timeout = self.timeout if timeout is False else timeout
+        async def run():
+            async with self.slots:
+                call = functools.partial(suggest, text, language, base_date, locale_timezone, locale)
+                return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+        return await asyncio.wait_for(run(), timeout)
+
+    async def parse_in_batch(self, text, key):
+        import asyncio
+
+        # the place is released when the batch is parsed, even if the caller doesn't wait for it anymore
+        await self.slots.acquire()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        texts, futures, _ = batch = self.batches.setdefault(key, ([], [], None))
+        texts.append(text)
+        futures.append(future)
+        if len(texts) >= self.max_batch:
+            self.flush(key)
+        elif batch[2] is None:
+            self.batches[key] = (texts, futures, loop.call_later(self.window, self.flush, key))
+        return await future
+
+    ''' Send the batch of a key to executor '''
+    def flush(self, key):
+        import asyncio
+
+        texts, futures, timer = self.batches.pop(key)
+        if timer is not None:
+            timer.cancel()
+        call = functools.partial(parse_each, texts, *key, self.cache)
+        work = asyncio.get_running_loop().run_in_executor(self.executor, call)
+        work.add_done_callback(lambda done: self.finish(futures, done))
+
+    ''' Give the results of a batch to the futures that are still waiting for them '''
+    def finish(self, futures, done):
+        for position, future in enumerate(futures):
+            self.slots.release()
+            if future.done():
+                continue
+            if done.cancelled():
+                future.cancel()
+            elif done.exception() is not None:
+                future.set_exception(done.exception())
+            else:
+                result, error = done.result()[position]
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+''' Find the parts of a date in a text, without resolving them.
+
+Interpretations are kept in a LRU cache, so a repeated text doesn't go through the glossary again. The
+interpretation only depends on the year of base_date (to tell years from other numbers) and on the
+timezones that the end of the text matches, which are checked again before using a cached one.
+Args:
+    text: text to interpret
+    language: language of the text
+    locale: locale of the base_date
+    base_date: date the text is relative to, current datetime if it is None
+Returns:
+    DateParts: parts of the date or None if the text can't be parsed
+'''
+def interpret(text, language='en', locale="en_US", base_date=None):
+    if base_date is None:
+        base_date = datetime.now()
+
+    key = (text, language, locale, base_date.year)
+    with INTERPRET_LOCK:
+        cached = INTERPRET_CACHE.get(key)
+        if cached is not None:
+            INTERPRET_CACHE.move_to_end(key)
+
+    if cached is not None:
+        parts, timezones = cached
+        if all(get_timezone(phrase, base_date) == timezone for phrase, timezone in timezones):
+            return parts
+
+    timezones = []
+    parts = find_date_parts(text, language, locale, base_date, timezones)
+    with INTERPRET_LOCK:
+        INTERPRET_CACHE[key] = (parts, tuple(timezones))
+        INTERPRET_CACHE.move_to_end(key)
+        if len(INTERPRET_CACHE) > INTERPRET_CACHE_SIZE:
+            INTERPRET_CACHE.popitem(last=False)
+    return parts
+
+''' Remove every cached interpretation '''
+def clear_interpret_cache():
+    with INTERPRET_LOCK:
+        INTERPRET_CACHE.clear()
+
+''' Convert the parts of a date into the next datetime after base_date.
+
+Args:
+    parts: DateParts returned by interpret, or None
+    base_date: base date to calculate the future date, current datetime if it is None
+    locale_timezone: timezone of the base_date
+Returns:
+    datetime: future datetime or None if it can't be resolved
+'''
+def resolve(parts, base_date=None, locale_timezone=None):
+    if parts is None:
+        return None
+
     if base_date is None:
         base_date = datetime.now()
 
     if base_date.tzinfo is None and locale_timezone is not None:
-        base_date = base_date.replace(tzinfo=locale_timezone)
+        base_date = localize(base_date, locale_timezone)
+
+    hour = base_date.hour if parts.hour == FROM_BASE else parts.hour
+    minute = base_date.minute if parts.minute == FROM_BASE else parts.minute
+    second = base_date.second if parts.second == FROM_BASE else parts.second
+    if parts.pm_if_past and base_date.hour >= hour:
+        hour = hour + 12
+
+    return future_datetime(base_date=base_date, special=parts.special, days=parts.days, weekday=parts.weekday, 
+        day_number=parts.day_number, month=parts.month, year=parts.year, hour=hour, minute=minute, second=second,
+        weeks=parts.weeks, years=parts.years, months=parts.months, quarter=parts.quarter, timezone=parts.timezone, 
+        hours=parts.hours, minutes=parts.minutes, quarters=parts.quarters, locale_timezone=locale_timezone)
+
+# precision of base_date that a result depends on, from the coarsest to the finest
+GRANULARITY_DAY = 'day'
+GRANULARITY_HOUR = 'hour'
+GRANULARITY_MINUTE = 'minute'
+GRANULARITY_SECOND = 'second'
+GRANULARITIES = [GRANULARITY_DAY, GRANULARITY_HOUR, GRANULARITY_MINUTE, GRANULARITY_SECOND]
+# fields of base_date that are cleared to get the start of its bucket
+BUCKET_START = {
+    GRANULARITY_DAY: {'hour': 0, 'minute': 0, 'second': 0, 'microsecond': 0},
+    GRANULARITY_HOUR: {'minute': 0, 'second': 0, 'microsecond': 0},
+    GRANULARITY_MINUTE: {'second': 0, 'microsecond': 0},
+    GRANULARITY_SECOND: {'microsecond': 0},
+}
+
+''' Return the finest of two granularities '''
+def finest(granularity, other):
+    return max(granularity, other, key=GRANULARITIES.index)
+
+''' Return the precision of base_date that the result of parts depends on.
+
+Within a day (or hour, minute, second) of base_date the result of parts is the same, as long as the start
+of that period is kept apart (a time compared with base_date can be just on it):
+- specials and "friday" only take the date of base_date, "tonight" and "today" also take its hour
+- "in 2 hours" takes the minute of base_date (FROM_BASE)
+- "in 3 days" or "next month" are always after base_date, so they only take its date
+- anything else is compared with base_date, so it needs the precision of its time ("15th 10:30" needs the minute)
+Args:
+    parts (DateParts): parts of the date
+    other_timezone (bool): True if the result is in another timezone than base_date, so the comparison is exact
+Returns:
+    string: one of GRANULARITIES, or None if the result depends on the whole base_date
+'''
+def result_granularity(parts, other_timezone=False):
+    # "later tonight" keeps the microseconds of base_date
+    if parts.special == LATER_TONIGHT:
+        return None
 
+    relative = parts.years or parts.quarters or parts.months or parts.weeks or parts.days or parts.hours or parts.minutes
+    # a weekday in a month or in a year starts from base_date itself
+    if (parts.special is None and not relative and parts.weekday is not None and parts.day_number is None
+            and (parts.month is not None or parts.year is not None)):
+        return None
+
+    # parts of base_date that are copied into the result
+    if parts.second == FROM_BASE:
+        return GRANULARITY_SECOND
+    if parts.minute == FROM_BASE:
+        granularity = GRANULARITY_MINUTE
+    elif parts.hour == FROM_BASE or parts.pm_if_past:
+        granularity = GRANULARITY_HOUR
+    else:
+        granularity = GRANULARITY_DAY
+
+    if parts.special is not None:
+        if parts.special == TONIGHT or (parts.special == TODAY and parts.hour is None):
+            return finest(granularity, GRANULARITY_HOUR)
+        return granularity
+
+    only_weekday = not relative and parts.weekday is not None and parts.day_number is None
+    always_after = (relative and not parts.hours and not parts.minutes and parts.month is None and parts.year is None
+        and (parts.day_number is None or (parts.day_number == 1 and (parts.months or parts.years or parts.quarters))))
+    if only_weekday or (always_after and not other_timezone):
+        return granularity
+
+    # the result is compared with base_date
+    if other_timezone or parts.second not in (None, 0):
+        return GRANULARITY_SECOND
+    if parts.minute not in (None, 0):
+        return finest(granularity, GRANULARITY_MINUTE)
+    return finest(granularity, GRANULARITY_HOUR)
+
+''' LRU cache of the results of parse for base dates in the same period.
+
+The key is the parts of the text, the timezones and the period (day, hour, minute or second, see result_granularity)
+of base_date, so "tomorrow" is resolved once a day and "in 2 hours" once a minute. It is opt-in:
+    cache = ResultCache()
+    parse('tomorrow', cache=cache)
+Args:
+    maxsize (int): max number of results kept
+'''
+class ResultCache:
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.results)
+
+    ''' Return the key of the result of parts at base_date, None if it can't be cached '''
+    def key(self, parts, base_date, locale_timezone, other_timezone):
+        granularity = result_granularity(parts, other_timezone)
+        if granularity is None:
+            return None
+        start = base_date.replace(**BUCKET_START[granularity])
+        return (parts, locale_timezone, base_date.tzinfo, base_date.utcoffset(), start.replace(tzinfo=None), start == base_date)
+
+    ''' Return the result of parts at base_date, resolving it if it isn't cached '''
+    def resolve(self, parts, base_date, locale_timezone=None, other_timezone=False):
+        key = self.key(parts, base_date, locale_timezone, other_timezone)
+        if key is not None:
+            with self.lock:
+                if key in self.results:
+                    self.results.move_to_end(key)
+                    self.hits += 1
+                    return self.results[key]
+
+        result = resolve(parts, base_date, locale_timezone)
+        with self.lock:
+            self.misses += 1
+            if key is not None:
+                self.results[key] = result
+                if len(self.results) > self.maxsize:
+                    self.results.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+            self.hits = 0
+            self.misses = 0
+
+# specials that resolve_many computes with arrays, the others are resolved row by row
+COLUMN_SPECIALS = {None: 0, TODAY: 1, WEEKEND: 2, TONIGHT: 3, TOMORROW: 4, NEXT_WEEK: 5, NEXT_MONTH: 6,
+    NEXT_QUARTER: 7, NEXT_YEAR: 8}
+# int of a part that is None, and of an hour, minute or second that is FROM_BASE
+COLUMN_NONE = -1
+COLUMN_FROM_BASE = -2
+# relative parts bigger than this are resolved row by row, so the arithmetic can't overflow
+COLUMN_MAX_RELATIVE = 10 ** 7
+COLUMN_EPOCH = datetime(1970, 1, 1)
+COLUMN_MICROSECOND = timedelta(microseconds=1)
+
+''' Return the parts as a tuple of ints for the columns of resolve_many, or None if they have to be
+resolved row by row (timezones, weekday with day, month or year, values out of range)
+'''
+def column_values(parts):
+    if parts.timezone is not None or parts.special not in COLUMN_SPECIALS:
+        return None
+    relative = (parts.years, parts.quarters, parts.months, parts.weeks, parts.days, parts.hours, parts.minutes)
+    if any(type(x) is not int or abs(x) > COLUMN_MAX_RELATIVE for x in relative):
+        return None
+    if (parts.special is None and not any(relative) and parts.weekday is not None
+            and (parts.day_number is not None or parts.month is not None or parts.year is not None)):
+        return None
+
+    values = [COLUMN_SPECIALS[parts.special]]
+    for value, low, high in ((parts.weekday, 0, 6), (parts.day_number, 1, 31), (parts.month, 1, 12),
+            (parts.year, 1, 9999), (parts.quarter, 1, 4), (parts.hour, 0, 23), (parts.minute, 0, 59), (parts.second, 0, 59)):
+        if value is None:
+            values.append(COLUMN_NONE)
+        elif value == FROM_BASE:
+            values.append(COLUMN_FROM_BASE)
+        elif type(value) is int and low <= value <= high:
+            values.append(value)
+        else:
+            return None
+    if parts.pm_if_past and parts.hour is None:
+        return None
+    values.append(1 if parts.pm_if_past else 0)
+    # there is nothing to calculate if every part is None or 0
+    nothing = parts.special is None and all(x == COLUMN_NONE for x in values[1:9]) and not any(relative)
+    return tuple(values) + relative + (int(any(relative)), int(nothing))
+
+''' Return the first day (datetime64[D]) and the number of days of months, given as year * 12 + month - 1 '''
+def month_range(np, index):
+    months = (index - 1970 * 12).astype('datetime64[M]')
+    start = months.astype('datetime64[D]')
+    return start, ((months + 1).astype('datetime64[D]') - start).astype(np.int64)
+
+''' Resolve many parts, each one against its base date, with NumPy datetime64 arithmetic.
+
+It is what [resolve(p, b, locale_timezone) for p, b in zip(parts, base_dates)] returns. Specials, weekdays,
+dates and relative parts are computed for all the rows at once, and only the rare cases are resolved
+row by row: timezones (datetime64 has no timezone, so naive base dates are needed and locale_timezone
+must be None), a weekday with a day, month or year, days that don't exist in a month and LATER_TONIGHT.
+Without NumPy every row is resolved with resolve.
+Args:
+    parts: sequence of DateParts (or None) returned by interpret
+    base_dates: a base date for every parts, or a single one for all of them (current datetime if it is None)
+    locale_timezone: timezone of the base dates
+Returns:
+    list: a datetime (or None) for every parts, in the same order
+'''
+def resolve_many(parts, base_dates=None, locale_timezone=None):
+    parts = list(parts)
+    single = base_dates is None or isinstance(base_dates, datetime)
+    base_array = None
+    if single:
+        base_dates = [base_dates or datetime.now()] * len(parts)
+    elif hasattr(base_dates, 'dtype'):
+        base_array = base_dates.astype('datetime64[us]')
+        base_dates = base_array.tolist()
+    else:
+        base_dates = list(base_dates)
+    if len(base_dates) != len(parts):
+        raise ValueError("there are %d parts and %d base dates" % (len(parts), len(base_dates)))
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is None or locale_timezone is not None:
+        return [resolve(x, base_date, locale_timezone) for x, base_date in zip(parts, base_dates)]
+
+    # the values of the same DateParts object are found once
+    results = [None] * len(parts)
+    found = {}
+    table = []
+    rows = []
+    codes = []
+    for row, x in enumerate(parts):
+        if x is None:
+            continue
+        code = found.get(id(x))
+        if code is None:
+            values = column_values(x)
+            code = found[id(x)] = -1 if values is None else len(table)
+            if values is not None:
+                table.append(values)
+        if code < 0 or base_dates[row].tzinfo is not None:
+            results[row] = resolve(x, base_dates[row])
+        else:
+            rows.append(row)
+            codes.append(code)
+    if not rows:
+        return results
+
+    table = np.array(table, dtype=np.int64)
+    if single:
+        # every row has the same base date, so each different parts is resolved once
+        base = np.full(len(table), np.datetime64(base_dates[0], 'us'))
+        result, by_row = resolve_columns(np, np.ascontiguousarray(table.T), base)
+    else:
+        if base_array is not None:
+            base = base_array[rows]
+        else:
+            # converting datetimes to datetime64 one by one is slower than finding the microseconds since the epoch
+            base = np.array([(base_dates[row] - COLUMN_EPOCH) // COLUMN_MICROSECOND for row in rows],
+                dtype=np.int64).astype('datetime64[us]')
+        result, by_row = resolve_columns(np, np.ascontiguousarray(table[np.array(codes)].T), base)
+        codes = range(len(rows))
+
+    values = result.astype('datetime64[us]').tolist()
+    again = by_row.tolist()
+    for row, code in zip(rows, codes):
+        results[row] = resolve(parts[row], base_dates[row]) if again[code] else values[code]
+    return results
+
+''' Resolve columns of parts (ints of column_values, a row for each field) against an array of naive base
+dates (datetime64[us]), like future_datetime does.
+
+Returns the results (NaT for None) and which rows have to be resolved row by row
+'''
+def resolve_columns(np, columns, base):
+    (special, weekday, day_number, month, year, quarter, hour, minute, second, pm_if_past,
+        years, quarters, months, weeks, days, hours, minutes, has_relative, nothing) = columns
+    base_day = base.astype('datetime64[D]')
+    base_month_start = base.astype('datetime64[M]')
+    base_year = base_month_start.astype(np.int64) // 12 + 1970
+    base_month = base_month_start.astype(np.int64) % 12 + 1
+    base_day_number = (base_day - base_month_start.astype('datetime64[D]')).astype(np.int64) + 1
+    base_weekday = (base_day.astype(np.int64) + 3) % 7 # 1970-01-01 was Thursday
+    base_seconds = (base - base_day).astype('timedelta64[s]').astype(np.int64)
+    base_hour = base_seconds // 3600
+
+    # what resolve and the start of future_datetime do with hour, minute and second
+    hour = np.where(hour == COLUMN_FROM_BASE, base_hour, hour)
+    minute = np.where(minute == COLUMN_FROM_BASE, base_seconds // 60 % 60, minute)
+    second = np.where(second == COLUMN_FROM_BASE, base_seconds % 60, second)
+    hour = np.where((pm_if_past == 1) & (base_hour >= hour), hour + 12, hour)
+    hour_was_none = hour == COLUMN_NONE
+    hour = np.where(hour_was_none, DEFAULT_HOUR, hour)
+    minute = np.where(minute == COLUMN_NONE, 0, minute)
+    second = np.where(second == COLUMN_NONE, 0, second)
+    time = (hour * 3600 + minute * 60 + second).astype('timedelta64[s]')
+
+    result = np.full(len(base), np.datetime64('NaT'), dtype='datetime64[s]')
+    # rows that are resolved row by row after all, because future_datetime raises an error or loops
+    by_row = hour > 23
+    relative = (has_relative == 1) & (special == 0)
+    plain = (special == 0) & ~relative & (nothing == 0)
+
+    def put(mask, day, seconds=None):
+        result[mask] = day[mask] + (time[mask] if seconds is None else seconds[mask])
+
+    today = special == COLUMN_SPECIALS[TODAY]
+    today_hour = np.select([base_hour < 12, base_hour < 17, base_hour < 21], [12, 17, 21], 23)
+    today_minute = np.where(base_hour < 21, 0, 59)
+    put(today, base_day, np.where(hour_was_none, today_hour * 3600 + today_minute * 60, hour * 3600).astype('timedelta64[s]'))
+    weekend_day = base_day + np.where(base_day_number >= 5, 2, 0)
+    put(special == COLUMN_SPECIALS[WEEKEND], weekend_day + (5 - (weekend_day.astype(np.int64) + 3) % 7) % 7)
+    tonight = (special == COLUMN_SPECIALS[TONIGHT]) & (base_hour < TONIGHT_TIME)
+    put(tonight, base_day, np.full(len(base), TONIGHT_TIME * 3600).astype('timedelta64[s]'))
+    put(special == COLUMN_SPECIALS[TOMORROW], base_day + 1)
+    put(special == COLUMN_SPECIALS[NEXT_WEEK], base_day + np.where(base_weekday > 0, 7 - base_weekday, 7))
+    put(special == COLUMN_SPECIALS[NEXT_MONTH], (base_month_start + 1).astype('datetime64[D]'))
+    next_quarter = special == COLUMN_SPECIALS[NEXT_QUARTER]
+    # future_datetime raises an error in December (the quarter starts in month 13)
+    by_row |= next_quarter & (base_month == 12)
+    put(next_quarter, month_range(np, base_year * 12 + base_month // 3 * 3 + 3)[0])
+    put(special == COLUMN_SPECIALS[NEXT_YEAR], month_range(np, (base_year + 1) * 12)[0])
+
+    # quarters are the months up to the start of that quarter
+    has_quarters = (quarters > 0) & relative
+    months = np.where(has_quarters, quarters * 3 - (base_month - 1) % 3, months)
+    day_number = np.where(has_quarters, 1, day_number)
+
+    # only weekday, the next one after the base day
+    only_weekday = plain & (weekday >= 0)
+    next_day = base_day + 1
+    put(only_weekday, next_day + (weekday - (next_day.astype(np.int64) + 3) % 7) % 7)
+
+    # weekday is blank, the first date after the base date that has the parts
+    dates = plain & (weekday < 0)
+    has_greater = (month >= 0) | (quarter >= 0) | (year >= 0)
+    plus_day = (day_number < 0) & ~has_greater & (hour <= base_hour)
+    day = np.where(day_number >= 0, day_number, np.where(has_greater, 1, base_day_number))
+    plus_month = (month < 0) & (quarter < 0) & (year < 0) & (day < base_day_number)
+    date_month = np.where(month >= 0, month, np.where(quarter >= 0, (quarter - 1) * 3 + 1, np.where(year >= 0, 1, base_month)))
+    plus_year = ((year < 0) & ((month >= 0) | (quarter >= 0))
+        & ((date_month < base_month) | ((date_month == base_month) & (day < base_day_number))))
+    index = np.where(year >= 0, year, base_year) * 12 + date_month - 1
+    start, month_length = month_range(np, index)
+    new_start, max_day = month_range(np, index + plus_year * 12 + plus_month)
+    # a day that the month doesn't have (or the last day, already past) is a search month by month or year by year
+    past_last_day = (month_length < day) | (start + day - 1 + time <= base)
+    by_row |= dates & ((max_day < day) | ((max_day == day) & past_last_day))
+    put(dates, new_start + day - 1 + plus_day)
+
+    # relative parts are added to the date (or the base date) like relativedelta does
+    index = np.where(year >= 0, year, base_year) * 12 + np.where(month >= 0, month, base_month) - 1
+    day = np.where(day_number >= 0, day_number, base_day_number)
+    by_row |= relative & (month_range(np, index)[1] < day)
+    index = index + years * 12 + months
+    by_row |= relative & ((index < 12) | (index >= 10000 * 12))
+    new_start, max_day = month_range(np, np.clip(index, 12, 10000 * 12 - 1))
+    offset = ((days + weeks * 7) * 86400 + hours * 3600 + minutes * 60).astype('timedelta64[s]')
+    put(relative, new_start + np.minimum(day, max_day) - 1, time + offset)
+
+    # only the results of dates and relative parts have to be after the base date
+    past = (dates | relative) & ~(result > base)
+    result[past] = np.datetime64('NaT')
+    by_row |= (result < np.datetime64('0001-01-01')) | (result > np.datetime64('9999-12-31T23:59:59'))
+    result[by_row] = np.datetime64('NaT')
+
+    return result, by_row
+
+''' Find the parts of a date in a text (what interpret does without the cache).
+
+Args:
+    text: text to interpret
+    language: language of the text
+    locale: locale of the base_date
+    base_date: date the text is relative to
+    timezones: list where the texts looked up as timezones and the timezones they gave are added
+Returns:
+    DateParts: parts of the date or None if the text can't be parsed
+'''
+def find_date_parts(text, language, locale, base_date, timezones):
     month_pos, day_pos = get_locale_monthdate(locale)
 
     text = normalize(text)
-    words = text.split(" ")
+    # the text is split once, the next stages mark the tokens they use
+    tokens = tokenize(text, language)
     results = []
     
     timezone = None
@@ -616,67 +2164,49 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
     minute = None
     second = None
     quarter = None
+    pm_if_past = False
 
-    #### FIND NUMBERS AND LETTERS (1w, 2mo, 3d, 4h, 5m, 6mins) ######
-    # replace with number and word for easier parsing
-    for i, word in enumerate(words):
-        if word[0].isdigit() and word[-1].isalpha() and not word.endswith(tuple(AM_PM)):
-            last_digit = 0
-            for i in reversed(range(len(word))):
-                if word[i].isdigit():
-                    last_digit = i
-                    break
-            
-            number = int(word[:last_digit+1])
-            letters = word[last_digit+1:]
-            
-            relative_word = words_to_datepart(letters, language, filter=["relative"])
-            
-            if relative_word is not None:
-                new_word = str(number) + ' ' + relative_word['result'][0]['value']
-                text = re.sub(r'\b' + word + r'\b', new_word, text)
-                words = text.split(" ")
-
-    
     ### FIND RELATIVE ###
     # first occurrence of "in" word
-    start = find_pos_in_glossary(text, 'in', language)
+    start = find_pos_in_glossary(tokens, 'in', language)
     
     # first occurence of relative word
     if start is None:
-        first_relative = find_exact_in_glossary(text, 'relative', language)
+        first_relative = find_exact_in_glossary(tokens, 'relative', language)
         
         # first relative minus one because number is before the first relative word
         if first_relative is not None:
             first_relative = first_relative - 1
-            first_word = words[first_relative]
-            if words_to_datepart(first_word, language, filter=["number"]) is not None or first_word.isdigit():
+            first_word = tokens[first_relative]
+            if words_to_datepart(first_word.text, language, filter=["number"]) is not None or first_word.kind == NUMBER_TOKEN:
                 start = first_relative
     
     # if there is an "in" phrase or a relative word, it has to be a relative date, it only looks for possible relative phrase
     # with two periods max (i.e. "in 2 days and 3 hours" but not "in a month, 2 days and 3 hours")
     if start is not None:
         #in_phrase is the maximum length for an in phrase (i.e. "in 2 days and an hour", 6 words)
+        # (start is -1 when the relative word is the first one, so like the old slice it takes only the last word)
+        start, end, _ = slice(start, start + 6).indices(len(tokens))
         
-        in_phrase = words[start: start+6]
-        
-        # replace "a" and "an" with 1
-        # replace "one" with 1, "two" with 2 ... "fifteen" with 15
-        for i, word in enumerate(in_phrase):
-            result = words_to_datepart(word, language, filter=["number"])
+        # "a" and "an" are 1, "one" is 1, "two" is 2 ... "fifteen" is 15
+        for i in range(start, end):
+            result = words_to_datepart(tokens[i].text, language, filter=["number"])
             if result is not None:
-                in_phrase[i] = str(result['result'][0]['value'])
+                tokens[i].value = result['result'][0]['value']
 
-        
         relatives = {}
         
         # tries to find relative period words and assign previous word as value
         # i.e. "in 2 days and 3 hours" -> {'days': 2, 'hours': 3}
-        for i, word in enumerate(in_phrase):
-            result = words_to_datepart(word, language, filter=["relative"])
+        for i in range(start, end):
+            if tokens[i].value is not None:
+                continue
+            result = words_to_datepart(tokens[i].text, language, filter=["relative"])
             if result is not None:
-                relatives[result['result'][0]['value']] = in_phrase[i-1]
-        
+                # like a slice, the word before the first one of the phrase is the last one
+                previous = tokens[i-1] if i > start else tokens[end-1]
+                relatives[result['result'][0]['value']] = previous.value if previous.value is not None else previous.text
+
         # after getting relative values it assigns them to the corresponding variable
         hours = int(relatives['hours']) if 'hours' in relatives else 0
         minutes = int(relatives['minutes']) if 'minutes' in relatives else 0
@@ -690,9 +2220,9 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
         if hours == 0 and minutes == 0:
             hour = DEFAULT_HOUR
         else:
-            hour = base_date.hour
+            hour = FROM_BASE
             # if minutes > 0:
-            minute = base_date.minute
+            minute = FROM_BASE
     
     else:
 
@@ -702,33 +2232,32 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
         # i.e. january -> month = 1, afternoon -> hour = 15
 
         # start looking for 3 words phrases, then 2 words phrases and finally 1 word
-        for size in range(3, 0, -1):
+        # all the phrases are found in a single pass over the words, then the longest ones are taken first
+        matches = get_glossary(language).match_phrases([token.text for token in tokens])
+        for size in range(MAX_PHRASE_WORDS, 0, -1):
+            # words that weren't part of a longer phrase, the timezone is looked up at the end of them
+            last = find_last_unused(tokens, size)
+            matched = False
             # stop looking at len(words) - size, so if there are 10 words you can only look up to 8th word for a 3 words prhase
-            for i in range(len(words) - size + 1):
-                # print(f"Position {i} of {len(words)-size}. Word:")
-                word = ' '.join(words[i:i+size])
+            for i in range(len(tokens) - size + 1):
                 # conditional to avoid looking for erased words
-                if words[i] is not None:
-                    # print(words[i:i+size])
-                    result = words_to_datepart(word, language)
-                    
-                    if result is not None:
-                        for x in result['result']:
-                            results.append(x)
-                        # set words to None so they aren't considered again
-                        words[i:i+size] = [None] * size
-                    else:
-                        #### FIND TIMEZONE ONLY AT THE END ###
-                        if i == len(words) - size:
-                            if tz := get_timezone(word): 
-                                timezone = tz
-                                
-                                words[i:i+size] = [None] * size
+                if size in matches[i] and not any(tokens[j].used for j in range(i, i + size)):
+                    results.extend(matches[i][size]['result'])
+                    matched = True
+                    # mark words so they aren't considered again
+                    for j in range(i, i + size):
+                        tokens[j].used = True
+
+            #### FIND TIMEZONE ONLY AT THE END ###
+            if last is not None and (not matched or find_last_unused(tokens, size) == last):
+                phrase = ' '.join(tokens[j].text for j in range(last, len(tokens)) if not tokens[j].used)
+                tz = get_timezone(phrase, base_date)
+                timezones.append((phrase, tz))
+                if tz:
+                    timezone = tz
+                    for j in range(last, len(tokens)):
+                        tokens[j].used = True
 
-            
-            # remove empty words (erased words because they are part of a phrase)
-            words[:] =  (value for value in words if value != None)
-        
         for r in results:
             if r['type'] == 'special':
                 if special is None:
@@ -771,34 +2300,54 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
                 hour = r['value']            
             elif r['type'] == HOURS:
                 hours = r['value']
-                hour = base_date.hour
-                minute = base_date.minute
-                second = base_date.second
+                hour = FROM_BASE
+                minute = FROM_BASE
+                second = FROM_BASE
             elif r['type'] == HOURS_NO_MIN:
                 hours = r['value']
-                hour = base_date.hour
+                hour = FROM_BASE
                 minute = 0
                 second = 0
             elif r['type'] == TIMEZONE:
-                timezone = pytz.timezone(r['value'])
+                timezone = get_timezone_backend().timezone(r['value'])
 
         # check if am or pm is separated from the time. If it is, join them
-        for i in range(1, len(words)):
-            if words[i] in AM_PM:
-                words[i-1] = words[i-1] + words[i]
-                words[i] = None
-            
-        # remove empty words (erased am/pm)
-        words[:] =  (value for value in words if value != None)
+        previous = None
+        for token in tokens:
+            if token.used:
+                continue
+            if previous is not None and token.text in AM_PM:
+                previous.text = previous.text + token.text
+                previous.end = token.end
+                previous.kind = WORD_TOKEN
+                previous.value = None
+                token.used = True
+            else:
+                previous = token
+
+        # words that weren't used by a phrase, a timezone or an am/pm
+        words = [token for token in tokens if not token.used]
 
         ##### FIND DATE PARTS THAT HAVE NUMBER IN THEM #####
         # i.e. 1st, 3rd, 5th for day, time separated by colon, dates separated by slashes or dashes
         # time in military format or quarter like q1, q2, q3, q4
-        for pos, word in enumerate(words):
+        for pos, token in enumerate(words):
+            word = token.text
+            # numbers only go to the year, military hour and number checks, other words get their kind in one match
+            # (None for the unusual ones, which go through every check)
+            if token.kind == NUMBER_TOKEN:
+                match = None
+                kind = NUMBER_TOKEN
+            else:
+                match = NUMERIC_WORD_KINDS.fullmatch(word)
+                kind = match.lastgroup if match is not None else None
 
             #### FIND DAY WITH ORDINALS ######    
             # 1st = day 1, 5th = day 5, 31st = day 31
-            if word[0].isdigit() and word[-2:] in ORDINALS:
+            if kind == ORDINAL_WORD:
+                day_number = int(match.group('day'))
+                continue
+            if kind is None and word[0].isdigit() and word[-2:] in ORDINALS:
                 number = word[:-2]
                 try:
                     day_number = int(number)
@@ -810,28 +2359,40 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
             # 1:00 = 1 am, 1:14pm = 13:15, 1:00a.m. = 1 am, 1:00p.m. = 1 pm
 
             # if we don't have am or pm, we guess it is am
-            new_hour, new_minute, new_second = get_time(word)
-
-            if new_hour is not None:
-                hour = new_hour
-            if new_minute is not None:
-                minute = new_minute
-            if new_second is not None:
-                second = new_second
+            if kind == TIME_WORD:
+                hour = int(match.group('hour'))
+                if match.group('am_pm') is not None and 'p' in match.group('am_pm') and hour < 12:
+                    hour = hour + 12
+                pm_if_past = False
+                if match.group('minute') is not None:
+                    minute = int(match.group('minute'))
+                if match.group('second') is not None:
+                    second = int(match.group('second'))
+                continue
+            if kind is None:
+                new_hour, new_minute, new_second = get_time(word)
+
+                if new_hour is not None:
+                    hour = new_hour
+                    pm_if_past = False
+                if new_minute is not None:
+                    minute = new_minute
+                if new_second is not None:
+                    second = new_second
             
             #### FIND YEAR ######
             # uses can_be_year function (if word is 4 digits and is between this year and this year + 10)
             # 2024 = year 2024
-            if len(word) == 4 and word.isdigit():
-                maybe_year = int(word)
-                if can_be_year(maybe_year, base_date):
-                    year = int(word)
+            if len(word) == 4 and kind == NUMBER_TOKEN:
+                if can_be_year(token.value, base_date):
+                    year = token.value
                     continue
 
             #### FIND HOUR MILITARY FORMAT #####
             # 0830 = 08:30, 1600 = 16:00
-            if len(word) == 4 and word.isdigit():
+            if len(word) == 4 and kind == NUMBER_TOKEN:
                 hour = int(word[:2])
+                pm_if_past = False
                 minute = int(word[2:])
                 if not can_be_hour(hour) or not can_be_minute(minute):
                     return None
@@ -844,7 +2405,7 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
 
             #### FIND QUARTER ######
             # if starts with "q" and then a number between 1 and 4
-            if word[0] == 'q' and word[1:].isdigit():
+            if kind == QUARTER_WORD or (kind is None and word[0] == 'q' and word[1:].isdigit()):
                 quarter = int(word[1:])
                 if quarter > 4 or quarter < 1:
                     return None
@@ -853,10 +2414,13 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
 
             #### FIND DATE SEPARATED BY DASH OR SLASH ######
             separator = None
-            for char in word:
-                if char in SEPARATORS:
-                    separator = char
-                    break
+            if kind == SEPARATED_WORD:
+                separator = match.group('separator')
+            elif kind is None:
+                for char in word:
+                    if char in SEPARATORS:
+                        separator = char
+                        break
             
             # print(separator)
             if separator is not None:
@@ -985,10 +2549,10 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
                 continue
 
             ###### FIND JUST NUMBERS THAT COULD BE DAY, MONTH, YEAR, HOUR OR MINUTE ######
-            if word.isdigit():
-                number = int(word)
+            if token.kind == NUMBER_TOKEN:
+                number = token.value
                 
-                if  pos < len(words) - 1 and words[pos+1].isdigit():
+                if  pos < len(words) - 1 and words[pos+1].kind == NUMBER_TOKEN:
                     if month_pos == 0:
                         if month is None and can_be_month(number):
                             month = number
@@ -997,7 +2561,7 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
                             day_number = number
                             continue
                 
-                if words[pos-1].isdigit():
+                if words[pos-1].kind == NUMBER_TOKEN:
                     if month_pos == 1:
                         if month is None and can_be_month(number):
                             month = number
@@ -1016,17 +2580,16 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
                     continue
                 if hour is None and can_be_hour(number):
                     if number < 12:
-                        if base_date.hour < number:
-                            hour = number
-                        else:
-                            hour = number + 12
+                        # it is pm if the base date is already past it
+                        hour = number
+                        pm_if_past = True
                     continue
                 if minute is None and can_be_minute(number):
                     # if hour is nothing but previous is day_number, previous represents hour not day_number
                     # i.e. "17 40", 17 could be day (first option), but 40 can only be minute, so 17 is hour
                     # "17 24" also means hour and minute because day_number and year without month doesn't make sense
                     # in "25 26" 25 only could be day (not hour) so 26 can't be minute
-                    if hour is None and day_number is not None and words[i-1].isdigit() and int(words[i-1]) == day_number and can_be_hour(day_number):
+                    if hour is None and day_number is not None and words[pos-1].kind == NUMBER_TOKEN and words[pos-1].value == day_number and can_be_hour(day_number):
                         hour = day_number
                         day_number = None
                     
@@ -1036,11 +2599,9 @@ def parse(text, language='en', base_date=None, locale_timezone=None, locale="en_
                     continue
 
 
-    # print(f"calling future: base_date {str(base_date)} special {special}\n year {year} quarter {quarter} month {month} day_number {day_number} hour {hour} minute {minute} \ntimezone {timezone} locale_timezone {locale_timezone} \nyears {years} quarters {quarters} months {months} weeks {weeks} days {days} hours {hours} minutes {minutes}")
-    return future_datetime(base_date=base_date, special=special, days=days, weekday=weekday, 
-        day_number=day_number, month=month, year=year, hour=hour, minute=minute, second=second,
-        weeks=weeks, years=years, months=months, quarter=quarter, timezone=timezone, 
-        hours=hours, minutes=minutes, quarters=quarters, locale_timezone=locale_timezone)
+    return DateParts(special=special, weekday=weekday, day_number=day_number, month=month, year=year, quarter=quarter,
+        hour=hour, minute=minute, second=second, pm_if_past=pm_if_past, years=years, quarters=quarters, months=months,
+        weeks=weeks, days=days, hours=hours, minutes=minutes, timezone=timezone)
     
 '''It looks for a phrase or word into the glossary and returns the correspoding tuple (word, type, value)
 
@@ -1053,46 +2614,217 @@ Returns:
     (word, type, value): tuple with the word, type and value of the word
 '''
 def words_to_datepart(text, language='en', filter=None):
-    glossary = GLOSSARY[language]
-    if filter is not None:
-        # kind_words = [x['target'] for x in glossary if kind in [y['type'] for y in x['result']]]
-        glossary = [x for x in glossary if any(r['type'] in filter for r in x['result'])]
-    words = [x['target'] for x in glossary]
-    items = [glossary[words.index(x)] for x in words if x.startswith(text)]
-    # first ask if input text is exactly like one of the words in the glossary (word is first element of tuple of glossaries)
-    
-    if text in words:
-        return glossary[words.index(text)]
-    
+    glossary = get_glossary(language)
+
+    # first ask if input text is exactly like one of the words in the glossary
+    result = glossary.lookup(text, filter)
+    if result is not None:
+        return result
+
     # then ask if there is at least one word that starts with input text (if text is at least 3 characters long)
-    elif len([x for x in words if x.startswith(text) and len(text) >= 3]) >= 1:
-        # get all of the words that start with input text
-        items = [glossary[words.index(x)] for x in words if x.startswith(text)]
-
-        # slice items to remove the word and make a set of it, so if there are two or more words that start with input text
-        # and the result of those words is the same (i.e. they mean the same concept), it returns the first one
-        # EXAMPLE: tomor for tomorrow and tomorow
-        for x in range(1, len(items)):
-            if items[x]['result'] != items[x-1]['result']:
-                return None
-        return items[0]
+    # if there are two or more words that start with input text and the result of those words is the same
+    # (i.e. they mean the same concept), it returns the first one
+    # EXAMPLE: tomor for tomorrow and tomorow
+    if len(text) >= 3:
+        return glossary.lookup_prefix(text, filter)
+    return None
+
+''' Timezones from pytz. It is imported the first time a timezone is needed '''
+class PytzBackend:
+    name = 'pytz'
+
+    def __init__(self):
+        import pytz
+        self.pytz = pytz
+
+    ''' Return the names of every timezone, sorted '''
+    def all_timezones(self):
+        return self.pytz.all_timezones
+
+    def timezone(self, name):
+        return self.pytz.timezone(name)
+
+    ''' Return the UTC instants (naive) when any of the timezones changes its offset, sorted '''
+    def transitions(self, timezones):
+        return tuple(sorted({x for tz in timezones for x in getattr(tz, '_utc_transition_times', ())}))
+
+
+''' Timezones from the standard library (zoneinfo), it doesn't need pytz '''
+class ZoneInfoBackend:
+    name = 'zoneinfo'
+
+    def __init__(self):
+        import zoneinfo
+        self.zoneinfo = zoneinfo
+        self.names = None
+
+    ''' Return the names of every timezone, sorted.
+
+    Finding them means opening every file of the timezone database, so they are saved in a snapshot next to
+    the module that is used while the database directories don't change.
+    '''
+    def all_timezones(self):
+        if self.names is None:
+            stamp = self.database_stamp()
+            snapshot_path = None if stamp is None else os.path.join(SNAPSHOT_DIR, 'timezones.zoneinfo.pickle')
+            snapshot = read_snapshot(snapshot_path)
+            if snapshot is not None and snapshot['stamp'] == stamp:
+                self.names = snapshot['names']
+            else:
+                # Factory and localtime aren't real timezones (and pytz doesn't have them)
+                self.names = sorted(self.zoneinfo.available_timezones() - {'Factory', 'localtime'})
+                write_snapshot(snapshot_path, {'version': SNAPSHOT_VERSION, 'stamp': stamp, 'names': self.names})
+        return self.names
+
+    ''' Return the modification times of the timezone database directories and their tzdata.zi (it changes
+    with every release). None if the system doesn't have a database (i.e. it comes from the tzdata package)
+    '''
+    def database_stamp(self):
+        stamp = []
+        for directory in self.zoneinfo.TZPATH:
+            for path in (directory, os.path.join(directory, 'tzdata.zi')):
+                try:
+                    stamp.append((path, os.stat(path).st_mtime_ns))
+                except OSError:
+                    pass
+        return tuple(stamp) or None
+
+    def timezone(self, name):
+        return self.zoneinfo.ZoneInfo(name)
+
+    ''' zoneinfo doesn't publish its transitions, offsets are compared at each date '''
+    def transitions(self, timezones):
+        return None
+
+
+TIMEZONE_BACKENDS = {'pytz': PytzBackend, 'zoneinfo': ZoneInfoBackend}
+TIMEZONE_BACKEND = None
+
+''' Return the timezone backend, by default pytz or the one in the DATEPARSER_TZ_BACKEND environment variable '''
+def get_timezone_backend():
+    if TIMEZONE_BACKEND is None:
+        set_timezone_backend(os.environ.get('DATEPARSER_TZ_BACKEND', 'pytz'))
+    return TIMEZONE_BACKEND
+
+''' Set the timezone backend ('pytz' or 'zoneinfo') used for the timezones found in texts
+
+Args:
+    name (string): name of the backend
+Returns:
+    backend: the new backend
+'''
+def set_timezone_backend(name):
+    global TIMEZONE_BACKEND, TIMEZONE_INDEX
+    TIMEZONE_BACKEND = TIMEZONE_BACKENDS[name]()
+    # cached timezones belong to the previous backend
+    TIMEZONE_INDEX = None
+    find_timezone_names.cache_clear()
+    find_timezone_candidates.cache_clear()
+    equivalent_timezone.cache_clear()
+    clear_interpret_cache()
+    return TIMEZONE_BACKEND
+
+''' Index of the names of the timezones, to find the ones that contain a text without scanning all of them.
+
+Every name (lowercase) is split in trigrams, a text of 3 or more characters can only be in the names that have
+all of its trigrams, and usually the first trigram that isn't in any name already discards the text.
+'''
+class TimezoneIndex:
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.lower_names = [x.lower() for x in self.names]
+        # trigram -> positions of the names that contain it
+        self.trigrams = {}
+        for position, name in enumerate(self.lower_names):
+            for i in range(len(name) - 2):
+                self.trigrams.setdefault(name[i:i+3], set()).add(position)
+
+    ''' Return the names (in the order of names) that contain text, text has to be lowercase and at least 3 characters long '''
+    def search(self, text):
+        candidates = None
+        for i in range(len(text) - 2):
+            positions = self.trigrams.get(text[i:i+3])
+            if positions is None:
+                return ()
+            candidates = positions if candidates is None else candidates & positions
+            if not candidates:
+                return ()
+        return tuple(self.names[x] for x in sorted(candidates) if text in self.lower_names[x])
+
+
+TIMEZONE_INDEX = None
+
+''' Return the names of the timezones that contain text (already lowercase and with _ instead of spaces) '''
+@functools.lru_cache(maxsize=4096)
+def find_timezone_names(text):
+    global TIMEZONE_INDEX
+    if TIMEZONE_INDEX is None:
+        TIMEZONE_INDEX = TimezoneIndex(get_timezone_backend().all_timezones())
+    return TIMEZONE_INDEX.search(text)
+
+''' Return the candidate timezones of a text and the UTC instants when any of them changes its offset
+(None if the backend doesn't know them)
+'''
+@functools.lru_cache(maxsize=4096)
+def find_timezone_candidates(text):
+    backend = get_timezone_backend()
+    timezones = tuple(backend.timezone(x) for x in find_timezone_names(text))
+    return timezones, backend.transitions(timezones)
+
+''' Return the first timezone if all of them have the same offset at a UTC instant (naive) '''
+def same_offset_timezone(timezones, instant):
+    instant = instant.replace(tzinfo=UTC)
+    if len(set([instant.astimezone(x).utcoffset() for x in timezones])) == 1:
+        return timezones[0]
+    return None
+
+''' Return the first candidate timezone of text if all the candidates have the same offset in a transition window.
+
+Between two consecutive transitions of the candidates no offset changes, so the answer is the same for every date
+in the window and it is computed once.
+Args:
+    text (string): text already prepared for find_timezone_names
+    window (int): number of transitions of the candidates before the date
+Returns:
+    timezone: timezone object or None if the candidates have different offsets
+'''
+@functools.lru_cache(maxsize=4096)
+def equivalent_timezone(text, window):
+    timezones, transitions = find_timezone_candidates(text)
+    if window > 0:
+        instant = transitions[window - 1]
+    elif transitions:
+        instant = transitions[0] - timedelta(days=1)
+    else:
+        instant = datetime(2000, 1, 1)
+    return same_offset_timezone(timezones, instant)
 
 '''It looks for a word or phrase into the list of timezones and returns the correspoding timezone
 
+When several timezones contain the text, it returns the first one if all of them have the same offset at base_date
+(i.e. "buenos aires" is America/Argentina/Buenos_Aires and America/Buenos_Aires)
 Args:
-    text (string): text to search into the list of timezones in pytz library
+    text (string): text to search into the list of timezones of the timezone backend
+    base_date (datetime): date when the offsets are compared, a naive date is taken as UTC. Current date if it is None
 Returns:
     timezone: timezone object
 '''
-def get_timezone(text):
+def get_timezone(text, base_date=None):
     #at least 3 characterse, if not returns 2
     if text is not None and len(text) >= 3:
-        text = text.replace(' ', '_')
-        timezones = [pytz.timezone(tz) for tz in pytz.all_timezones if text.lower() in tz.lower()]
+        text = text.replace(' ', '_').lower()
+        timezones, transitions = find_timezone_candidates(text)
+        if not timezones:
+            return None
 
-        # if all timezones have the same offset, return the first timezone
-        if len(set([x.utcoffset(datetime.now()) for x in timezones])) == 1:
-            return timezones[0]
+        if base_date is None:
+            base_date = datetime.now(UTC).replace(tzinfo=None)
+        elif base_date.tzinfo is not None:
+            base_date = base_date.astimezone(UTC).replace(tzinfo=None)
+        if transitions is None:
+            return same_offset_timezone(timezones, base_date)
+        return equivalent_timezone(text, bisect.bisect_right(transitions, base_date))
         
     return None
 
@@ -1140,42 +2872,201 @@ def suggest(text, language='en', base_date=None, locale_timezone=None, locale="e
         # print("a match ", first_result)
         return first_result
     
-    glossary = GLOSSARY[language]
+    glossary = get_glossary(language)
     suggestions = []
-    for word, type, val in glossary:
-        if word.startswith(text):
-            if (type, val) not in [(s[1], s[2]) for s in suggestions]:
-                if type == "timezone":
-                    word = "10:00a.m. " + word
-                suggestions.append((word, type, val))
+    # first the words that start with text (walking the prefix trie), then the words that contain it
+    candidates = glossary.complete(text)
+    if len(candidates) < max_suggestions:
+        candidates = candidates + [x for x in glossary.entries if text in x['target'] and not x['target'].startswith(text)]
+    for entry in candidates:
+        word = entry['target']
+        type = entry['result'][0]['type']
+        val = entry['result'][0]['value']
+        if (type, val) not in [(s[1], s[2]) for s in suggestions]:
+            if type == "timezone":
+                word = "10:00a.m. " + word
+            suggestions.append((word, type, val))
         
         if len(suggestions) >= max_suggestions:
             break
-    if len(suggestions) < max_suggestions:
-        for word, type, val in glossary:
-            if text in word:
-                if (type, val) not in [(s[1], s[2]) for s in suggestions]:
-                    if type == "timezone":
-                        word = "10:00a.m. " + word
-                    suggestions.append((word, type, val))
-            
-            if len(suggestions) >= max_suggestions:
-                break
     
     if len(text.split()) == 1 and text.isdigit():
-        results.append(("in " + text + " days", None, None))
+        suggestions.append(("in " + text + " days", None, None))
         month = (base_date + relativedelta(months=1)).strftime("%B")
         if can_be_day(text):
-            results.append((text + "-" + month, None, None))
-        if can_be_year(text):
-            results.append((text + "-" + month, None, None))
+            suggestions.append((text + "-" + month, None, None))
+        if can_be_year(text, base_date):
+            suggestions.append((text + "-" + month, None, None))
         if can_be_hour(text):
-            results.append((text + ":00", None, None))
+            suggestions.append((text + ":00", None, None))
 
     results = [(x, parse(x, language=language, base_date=base_date, locale_timezone=locale_timezone, locale=locale)) for x, _, _ in suggestions]
-    print("POSSIBLE DATES:")
-    for x in results:
-        print(x[0], x[1].strftime("%Y-%m-%d %H:%M:%S %Z%z"))
+    return results
+
+''' Write the result of suggest, a date or the suggestions that can be resolved '''
+def print_suggestions(result, file=None):
+    if isinstance(result, datetime):
+        print(result.strftime("%Y-%m-%d %H:%M:%S %Z%z"), file=file)
+        return
+    print("POSSIBLE DATES:", file=file)
+    for x in result:
+        if x[1] is not None:
+            print(x[0], x[1].strftime("%Y-%m-%d %H:%M:%S %Z%z"), file=file)
     
 
-# suggest("33", locale_timezone=pytz.timezone('America/Buenos_Aires'))
\ No newline at end of file
+# suggest("33", locale_timezone=pytz.timezone('America/Buenos_Aires'))
+
+
+''' Answer a request of the daemon (a dict, see dateparser_client), it returns the answer as a dict '''
+def handle_request(request, cache=None):
+    op = request.get('op', 'parse')
+    language = request.get('language', 'en')
+    locale = request.get('locale', "en_US")
+    base_date = request.get('base_date')
+    base_date = datetime.now() if base_date is None else datetime.fromisoformat(base_date)
+    locale_timezone = request.get('tz')
+    if locale_timezone is not None:
+        locale_timezone = get_timezone_backend().timezone(locale_timezone)
+
+    to_text = lambda date: None if date is None else date.isoformat()
+    if op == 'parse':
+        return {'date': to_text(parse(request['text'], language, base_date, locale_timezone, locale, cache))}
+    if op == 'parse_many':
+        return {'dates': [to_text(x) for x in parse_many(request['texts'], language, base_date, locale_timezone,
+            locale, cache, errors='ignore')]}
+    if op == 'suggest':
+        result = suggest(request['text'], language, base_date, locale_timezone, locale)
+        if isinstance(result, datetime):
+            return {'date': to_text(result)}
+        return {'suggestions': [[x, to_text(y)] for x, y in result]}
+    return {'error': "unknown op %r" % op}
+
+# socket of the daemon of the user, dateparser_client has the same default
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp',
+    'dateparser-%d.sock' % getattr(os, 'getuid', lambda: 0)())
+
+''' Return a daemon that answers requests (JSON lines) on a Unix socket, see dateparser_client.
+
+The glossaries of languages and the timezones are loaded before it starts, and it keeps a ResultCache, so
+requests only pay for parsing. Every connection is served in a thread.
+Args:
+    path (string): socket path, a socket left there is replaced (any other file is an error)
+    languages: languages to load
+Returns:
+    socketserver.ThreadingUnixStreamServer: call serve_forever() to start it
+'''
+def make_server(path, languages=('en',)):
+    import socketserver
+    import stat
+
+    cache = ResultCache()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    response = handle_request(json.loads(line), cache)
+                except Exception as error:
+                    response = {'error': "%s: %s" % (type(error).__name__, error)}
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    for language in languages:
+        get_glossary(language)
+    find_timezone_names('utc')
+
+    with contextlib.suppress(FileNotFoundError):
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+    # the socket is created with mode 0600, there is no moment when other users can connect
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    return server
+
+# lines written at once by the command line
+OUTPUT_CHUNK = 1000
+
+''' Command line, it parses every line of a file (or stdin) and writes the date of each one (ISO 8601,
+an empty line if it can't be parsed or resolved) or a JSON line with the text and the date.
+
+    python -m dateparser dates.txt --base-date 2024-05-02T09:35 --tz America/Chicago
+    cat dates.txt | python -m dateparser --jsonl --workers 4 > dates.jsonl
+    python -m dateparser --serve            (daemon for dateparser_client)
+    python -m dateparser --suggest tw       (possible dates of an incomplete text)
+
+Lines are streamed, so memory doesn't depend on the size of the file.
+Args:
+    argv: arguments (without the program name), sys.argv[1:] if it is None
+Returns:
+    int: exit status
+'''
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m dateparser', description="Parse a date in every line of a text")
+    parser.add_argument('input', nargs='?', default='-', help="file with a text in every line, - (default) for stdin")
+    parser.add_argument('-o', '--output', default='-', help="file to write, - (default) for stdout")
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--locale', default='en_US')
+    parser.add_argument('--base-date', type=datetime.fromisoformat, help="ISO 8601 date, now by default")
+    parser.add_argument('--tz', help="timezone of the base date, i.e. America/Chicago")
+    parser.add_argument('--jsonl', action='store_true', help="write the text and the date as JSON lines")
+    parser.add_argument('--workers', type=int, help="number of processes that parse the lines")
+    parser.add_argument('--batch-size', type=int, default=1000, help="lines sent to a worker at once")
+    parser.add_argument('--strict', action='store_true', help="stop at a line that can't be resolved instead of skipping it")
+    parser.add_argument('--serve', nargs='?', const=DEFAULT_SOCKET, metavar='SOCKET',
+        help="run a daemon on a Unix socket (%s by default) instead of parsing lines" % DEFAULT_SOCKET)
+    parser.add_argument('--suggest', metavar='TEXT', help="write the possible dates of a text instead of parsing lines")
+    args = parser.parse_args(argv)
+
+    if args.serve is not None:
+        server = make_server(args.serve, [args.language])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(args.serve)
+        return 0
+
+    locale_timezone = None if args.tz is None else get_timezone_backend().timezone(args.tz)
+    if args.suggest is not None:
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+        try:
+            print_suggestions(suggest(args.suggest, args.language, args.base_date, locale_timezone, args.locale), output)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        return 0
+    input = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        texts, copies = itertools.tee(line.rstrip('\r\n') for line in input)
+        results = parse_iter(texts, args.language, args.base_date, locale_timezone, args.locale,
+            workers=args.workers, batch_size=args.batch_size, errors='raise' if args.strict else 'ignore')
+        lines = []
+        for text, result in zip(copies, results):
+            date = None if result is None else result.isoformat()
+            lines.append(json.dumps({'text': text, 'date': date}, ensure_ascii=False) if args.jsonl else date or '')
+            if len(lines) >= OUTPUT_CHUNK:
+                output.write('\n'.join(lines) + '\n')
+                lines = []
+        if lines:
+            output.write('\n'.join(lines) + '\n')
+    finally:
+        if input is not sys.stdin:
+            input.close()
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    # workers unpickle the functions of the module dateparser, not the ones of __main__
+    import dateparser
+    raise SystemExit(dateparser.main())
@@ -0,0 +1,125 @@
+'''
+Client of the dateparser daemon (python -m dateparser --serve).
+
+It only uses the standard library, so a short script or a shell command doesn't pay for importing dateparser,
+pytz and dateutil and loading the glossary, the daemon already has them loaded:
+
+    python -m dateparser --serve &
+    python -m dateparser_client "tomorrow 5pm" --tz America/Chicago
+
+Every request is a JSON line, i.e. {"op": "parse", "text": "tomorrow", "tz": "America/Chicago"}, and the daemon
+answers a JSON line, {"date": "2024-05-03T09:00:00-05:00"} or {"error": "..."}.
+'''
+import json
+import os
+import socket
+from datetime import datetime
+
+# socket of the daemon of the user, like dateparser.DEFAULT_SOCKET (the client doesn't import dateparser)
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp',
+    'dateparser-%d.sock' % getattr(os, 'getuid', lambda: 0)())
+
+
+''' Error returned by the daemon '''
+class DaemonError(Exception):
+    pass
+
+
+''' Connection to the daemon, it can send many requests.
+
+    with Client() as client:
+        client.parse('tomorrow', tz='America/Chicago')
+Args:
+    path (string): socket of the daemon
+    timeout (float): seconds to wait for an answer
+'''
+class Client:
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=10):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(path)
+        self.file = self.socket.makefile('rwb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    ''' Send a request (a dict) and return the answer, it raises DaemonError if the daemon answers an error '''
+    def request(self, request):
+        self.file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise DaemonError("the daemon closed the connection")
+        response = json.loads(line)
+        if 'error' in response:
+            raise DaemonError(response['error'])
+        return response
+
+    ''' Return the datetime of a text, or None if it can't be parsed. Arguments are the ones of dateparser.parse,
+    but base_date is a datetime or an ISO 8601 string and tz is the name of the locale timezone
+    '''
+    def parse(self, text, language='en', base_date=None, tz=None, locale="en_US"):
+        response = self.request(make_request('parse', language, base_date, tz, locale, text=text))
+        return to_datetime(response['date'])
+
+    ''' Return the datetimes of many texts, like dateparser.parse_many '''
+    def parse_many(self, texts, language='en', base_date=None, tz=None, locale="en_US"):
+        response = self.request(make_request('parse_many', language, base_date, tz, locale, texts=list(texts)))
+        return [to_datetime(x) for x in response['dates']]
+
+    ''' Return the datetime of a text if it can be parsed, or a list of (suggestion, datetime) like dateparser.suggest '''
+    def suggest(self, text, language='en', base_date=None, tz=None, locale="en_US"):
+        response = self.request(make_request('suggest', language, base_date, tz, locale, text=text))
+        if 'date' in response:
+            return to_datetime(response['date'])
+        return [(x, to_datetime(y)) for x, y in response['suggestions']]
+
+
+''' Return a request with the arguments that aren't the default ones '''
+def make_request(op, language, base_date, tz, locale, **fields):
+    request = {'op': op}
+    request.update(fields)
+    if language != 'en':
+        request['language'] = language
+    if base_date is not None:
+        request['base_date'] = base_date if isinstance(base_date, str) else base_date.isoformat()
+    if tz is not None:
+        request['tz'] = tz
+    if locale != "en_US":
+        request['locale'] = locale
+    return request
+
+def to_datetime(text):
+    return None if text is None else datetime.fromisoformat(text)
+
+
+''' Command line, it prints the date of every text (an empty line if it can't be parsed) '''
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m dateparser_client', description="Parse dates with the dateparser daemon")
+    parser.add_argument('texts', nargs='+')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--locale', default='en_US')
+    parser.add_argument('--base-date', help="ISO 8601 date, now by default")
+    parser.add_argument('--tz', help="timezone of the base date, i.e. America/Chicago")
+    args = parser.parse_args(argv)
+
+    with Client(args.socket) as client:
+        dates = client.parse_many(args.texts, args.language, args.base_date, args.tz, args.locale)
+    for date in dates:
+        print('' if date is None else date.isoformat())
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
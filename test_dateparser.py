@@ -1,9 +1,36 @@
 import unittest
-from dateparser import parse
-from datetime import datetime
+import asyncio
+import bisect
+import calendar
+import contextlib
+import io
+import itertools
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from zoneinfo import ZoneInfo
+from dateparser import parse, words_to_datepart, get_glossary, load_glossary, read_snapshot, get_locale_monthdate,\
+    find_timezone_names, get_timezone, set_timezone_backend, tokenize, interpret, resolve, clear_interpret_cache,\
+    INTERPRET_CACHE, FROM_BASE, ResultCache, result_granularity, GRANULARITY_DAY, GRANULARITY_HOUR, GRANULARITY_MINUTE,\
+    GRANULARITY_SECOND, parse_many, parse_iter, resolve_many, main, make_server, AsyncParser, suggest,\
+    search, parse_timestamp, NOT_TIMESTAMP, UTC, NUMERIC_WORD_KINDS, normalize, strip_accents,\
+    future_datetime, find_weekday_date, weekday_of, month_days, FIRST_WEEKDAYS, MONTH_LENGTHS
+import dateparser_client
+from dateparser_client import Client, DaemonError
+from datetime import datetime, timedelta
 
 import pytz
-from dateparser import DEFAULT_HOUR, END_OF_DAY_TIME
+try:
+    import numpy
+except ImportError:
+    numpy = None
+from dateparser import DEFAULT_HOUR, END_OF_DAY_TIME, NEXT_MONTH, NEXT_YEAR, WEEKEND, DEFAULT_SOCKET
 
 # py test_dateparser.py TestDateParser.test_just_month
 class TestDateParser(unittest.TestCase):
@@ -381,7 +408,7 @@ class TestDateParser(unittest.TestCase):
         # test 5am CT
         base_date = datetime(2023, 7, 10, 16, 22)
         expected_tz = pytz.timezone('US/Central')
-        expected_date = datetime(2023, 7, 11, 5, 0, tzinfo=expected_tz)
+        expected_date = expected_tz.localize(datetime(2023, 7, 11, 5, 0))
         
         tz = pytz.timezone('US/Central')
         self.assertEqual(parse('5am CT', base_date=base_date, locale_timezone=tz), expected_date)
@@ -389,7 +416,7 @@ class TestDateParser(unittest.TestCase):
         # test 6pm Buenos Aires
         base_date = datetime(2023, 7, 10, 16, 22)
         expected_tz = pytz.timezone('America/Argentina/Buenos_Aires')
-        expected_date = datetime(2023, 7, 11, 5, 0, tzinfo=expected_tz)
+        expected_date = expected_tz.localize(datetime(2023, 7, 11, 5, 0))
         tz = pytz.timezone('US/Central')
         self.assertEqual(parse('5am Buenos Aires', base_date=base_date, locale_timezone=tz), expected_date)
         
@@ -847,5 +874,650 @@ class TestDateParser(unittest.TestCase):
         expected_date = datetime(2023,11,24,DEFAULT_HOUR)
         self.assertEqual(parse('thanksgiving', base_date=base_date), expected_date)
 
+    def test_phrase_before_other_words(self):
+        # a phrase of several words that isn't at the end of the text
+        base_date = datetime(2023,11,8,11)
+        expected_date = datetime(2023,11,10,10)
+        self.assertEqual(parse('end of week 10am', base_date=base_date), expected_date)
+
+        base_date = datetime(2023,11,8,11)
+        expected_date = datetime(2023,11,11,10)
+        self.assertEqual(parse('fin de semana 10am', base_date=base_date, language="es"), expected_date)
+
+
+class TestGlossary(unittest.TestCase):
+
+    def test_exact_and_filtered_lookup(self):
+        # repeated targets return the first entry, unless a filter skips it
+        self.assertEqual(words_to_datepart('next month')['result'], [{'type': 'special', 'value': 'NEXT_MONTH'}])
+        self.assertEqual(words_to_datepart('next month', filter=['months'])['result'], [{'type': 'months', 'value': 1}])
+        self.assertEqual(words_to_datepart('mo', filter=['relative'])['result'][0]['value'], 'months')
+        self.assertIsNone(words_to_datepart('mo', filter=['number']))
+
+    def test_prefix_lookup(self):
+        # tomor is the beginning of tomorrow and tomorow, which mean the same
+        self.assertEqual(words_to_datepart('tomor')['target'], 'tomorrow')
+        # a prefix shorter than 3 characters is not enough
+        self.assertIsNone(words_to_datepart('to'))
+        # thu is only thursday, but "end of" could be end of day or end of week
+        self.assertEqual(words_to_datepart('thu')['target'], 'thursday')
+        self.assertIsNone(words_to_datepart('end of'))
+        self.assertEqual(words_to_datepart('mierc', language='es')['target'], 'miercoles')
+
+    def test_complete(self):
+        # targets that start with a prefix come in glossary order
+        self.assertEqual([x['target'] for x in get_glossary('en').complete('next ')],
+            ['next week', 'next month', 'next quarter', 'next year'])
+        self.assertEqual([x['target'] for x in get_glossary('en').complete('mo', filter=['relative'])], ['months', 'mo'])
+        self.assertEqual(get_glossary('en').complete('xyz'), [])
+
+    def test_match_phrases(self):
+        # every position gets the phrases of 1, 2 or 3 words that start there
+        matches = get_glossary('en').match_phrases(['5pm', 'end', 'of', 'week', 'tomor'])
+        self.assertEqual(matches[0], {})
+        self.assertEqual(matches[1][3]['target'], 'end of week')
+        self.assertNotIn(1, matches[1])
+        self.assertEqual(matches[4][1]['target'], 'tomorrow')
+
+    def test_tokenize(self):
+        # numbers have a value, "2mo" is split into a number and a relative word, repeated spaces are skipped
+        tokens = tokenize('in  2mo at 10 am')
+        self.assertEqual([x.text for x in tokens], ['in', '2', 'months', 'at', '10', 'am'])
+        self.assertEqual([x.value for x in tokens], [None, 2, None, None, 10, None])
+        self.assertEqual([x.span for x in tokens[:3]], [(0, 2), (4, 5), (5, 7)])
+        self.assertFalse(any(x.used for x in tokens))
+
+        base_date = datetime(2023,11,8,11)
+        self.assertEqual(parse('tomorrow  10 am', base_date=base_date), datetime(2023,11,9,10))
+
+    def test_units(self):
+        # units are resolved like words_to_datepart with the relative filter, prefixes included
+        units = get_glossary('en').units()
+        self.assertEqual(units['mo'], 'months')
+        self.assertEqual(units['min'], 'minutes')
+        self.assertEqual(units['mins'], 'minutes')
+        self.assertNotIn('pm', units)
+        self.assertEqual([x.text for x in tokenize('6mins 3dias', 'es')], ['6mins', '3', 'days'])
+        # regular expression characters in a word are not a problem
+        self.assertEqual([x.text for x in tokenize('2d+ (3h')], ['2d+', '(3h'])
+
+
+class TestLocale(unittest.TestCase):
+
+    def test_locale_table(self):
+        self.assertEqual(get_locale_monthdate('en_US'), (0, 1))
+        self.assertEqual(get_locale_monthdate('en_GB.UTF-8'), (1, 0))
+        self.assertEqual(get_locale_monthdate('es-AR'), (1, 0))
+        self.assertEqual(get_locale_monthdate('ja_JP'), (1, 2))
+
+    def test_parse_does_not_change_locale(self):
+        base_date = datetime(2023, 6, 1, 16, 22)
+        with mock.patch('locale.setlocale', side_effect=AssertionError("setlocale called")):
+            self.assertEqual(parse('9-12', base_date=base_date, locale="en_GB"), datetime(2023,12,9,DEFAULT_HOUR))
+            self.assertEqual(parse('9-12', base_date=base_date, locale="en_US"), datetime(2023,9,12,DEFAULT_HOUR))
+
+    def test_parse_in_threads(self):
+        base_date = datetime(2023, 6, 1, 16, 22)
+        inputs = [('9-12', 'en_GB'), ('9-12', 'en_US'), ('05 06 2024', 'en_GB'), ('05 06 2024', 'en_US')] * 50
+        expected = [parse(text, base_date=base_date, locale=locale) for text, locale in inputs]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda x: parse(x[0], base_date=base_date, locale=x[1]), inputs))
+        self.assertEqual(results, expected)
+
+
+class TestTimezone(unittest.TestCase):
+
+    def test_find_timezone_names(self):
+        self.assertEqual(find_timezone_names('buenos_aires'), ('America/Argentina/Buenos_Aires', 'America/Buenos_Aires'))
+        self.assertEqual(find_timezone_names('tomorrow'), ())
+        # every name that contains the text, like scanning pytz.all_timezones
+        self.assertEqual(find_timezone_names('us/c'), tuple(x for x in pytz.all_timezones if 'us/c' in x.lower()))
+
+    def test_get_timezone(self):
+        self.assertEqual(get_timezone('Buenos Aires').zone, 'America/Argentina/Buenos_Aires')
+        self.assertIsNone(get_timezone('5pm'))
+        self.assertIsNone(get_timezone('am'))
+
+    def test_get_timezone_at_base_date(self):
+        # Canada/Eastern, Chile/EasterIsland, Pacific/Easter and US/Eastern only have the same offset in January
+        self.assertEqual(get_timezone('easter', datetime(2023, 1, 15)).zone, 'Canada/Eastern')
+        self.assertIsNone(get_timezone('easter', datetime(2023, 7, 15)))
+        base_date = pytz.timezone('America/Argentina/Buenos_Aires').localize(datetime(2023, 1, 15, 22))
+        self.assertEqual(get_timezone('easter', base_date).zone, 'Canada/Eastern')
+
+
+class TestTimezoneBackend(unittest.TestCase):
+
+    def tearDown(self):
+        set_timezone_backend('pytz')
+
+    # wall time and offset, aware datetimes in a DST fold never compare equal between different tzinfo
+    def parse_all(self, backend):
+        backend = set_timezone_backend(backend)
+        texts = ['5am CT', '5am Buenos Aires', 'tomorrow 10am', 'in 2 hours', 'next week', 'tonight', '11/05 1:30am',
+            'march 10 2:30am', '10am new york', 'noon central']
+        base_dates = [datetime(2023, 3, 11, 23, 30), datetime(2023, 11, 4, 22, 0), datetime(2023, 7, 10, 16, 22)]
+        results = []
+        for name in ['America/Chicago', 'America/New_York']:
+            for base_date in base_dates:
+                for text in texts:
+                    result = parse(text, base_date=base_date, locale_timezone=backend.timezone(name))
+                    results.append((text, name, base_date, result.replace(tzinfo=None), result.utcoffset()))
+        return results
+
+    def test_same_results(self):
+        self.assertEqual(self.parse_all('pytz'), self.parse_all('zoneinfo'))
+
+    def test_zoneinfo_timezones(self):
+        set_timezone_backend('zoneinfo')
+        self.assertEqual(get_timezone('Buenos Aires'), ZoneInfo('America/Argentina/Buenos_Aires'))
+        self.assertIsNone(get_timezone('easter', datetime(2023, 7, 15)))
+        base_date = datetime(2023, 7, 10, 16, 22)
+        self.assertEqual(parse('5am CT', base_date=base_date, locale_timezone=ZoneInfo('US/Central')),
+            datetime(2023, 7, 11, 5, 0, tzinfo=ZoneInfo('US/Central')))
+
+
+class TestGlossarySnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'glossary.json')
+        self.snapshot_path = os.path.join(self.directory.name, 'glossary.en.pickle')
+        with open(self.path, 'w') as write_file:
+            json.dump({'en': [{'target': 'tomorrow', 'result': [{'type': 'special', 'value': 'TOMORROW'}]}],
+                'es': [{'target': 'manana', 'result': [{'type': 'special', 'value': 'TOMORROW'}]}]}, write_file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_snapshot_is_reused(self):
+        glossary = load_glossary('en', self.path, self.directory.name)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        self.assertEqual(glossary.lookup_prefix('tomo')['target'], 'tomorrow')
+        self.assertEqual(load_glossary('en', self.path, self.directory.name).lookup('tomorrow')['target'], 'tomorrow')
+
+        # same content with another modification time still uses the snapshot
+        os.utime(self.path, ns=(0, 0))
+        self.assertEqual(load_glossary('en', self.path, self.directory.name).lookup('tomorrow')['target'], 'tomorrow')
+        self.assertEqual(read_snapshot(self.snapshot_path)['mtime'], 0)
+
+    def test_snapshot_per_language(self):
+        # only the requested language is compiled and saved
+        load_glossary('es', self.path, self.directory.name)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['glossary.es.pickle', 'glossary.json'])
+        with self.assertRaises(KeyError):
+            load_glossary('fr', self.path, self.directory.name)
+
+    def test_file_is_parsed_once(self):
+        # every language is compiled from the same parsed file
+        with mock.patch('json.loads', wraps=json.loads) as loads:
+            load_glossary('en', self.path, None)
+            load_glossary('es', self.path, None)
+        self.assertEqual(loads.call_count, 1)
+
+    def test_snapshot_is_rebuilt(self):
+        load_glossary('en', self.path, self.directory.name)
+        with open(self.path, 'w') as write_file:
+            json.dump({'en': [{'target': 'today', 'result': [{'type': 'special', 'value': 'TODAY'}]}]}, write_file)
+        os.utime(self.path, ns=(10**9, 10**9))
+        glossary = load_glossary('en', self.path, self.directory.name)
+        self.assertIsNone(glossary.lookup('tomorrow'))
+        self.assertEqual(glossary.lookup('today')['target'], 'today')
+
+        # a broken snapshot is ignored
+        with open(self.snapshot_path, 'wb') as write_file:
+            write_file.write(b'not a snapshot')
+        self.assertEqual(load_glossary('en', self.path, self.directory.name).lookup('today')['target'], 'today')
+
+
+
+class TestInterpret(unittest.TestCase):
+
+    def setUp(self):
+        clear_interpret_cache()
+
+    def test_parts_are_resolved_later(self):
+        # the parts don't depend on the base date, so they are interpreted once
+        parts = interpret('at 5', base_date=datetime(2023,11,8,3))
+        self.assertEqual((parts.hour, parts.pm_if_past), (5, True))
+        self.assertIs(interpret('at 5', base_date=datetime(2023,11,8,11)), parts)
+        self.assertEqual(len(INTERPRET_CACHE), 1)
+        self.assertEqual(hash(parts), hash(interpret('at 5', base_date=datetime(2023,11,9))))
+        self.assertEqual(resolve(parts, datetime(2023,11,8,3)), datetime(2023,11,8,5))
+        self.assertEqual(resolve(parts, datetime(2023,11,8,11)), datetime(2023,11,8,17))
+
+        parts = interpret('in 2 hours')
+        self.assertEqual((parts.hours, parts.hour, parts.minute), (2, FROM_BASE, FROM_BASE))
+        self.assertEqual(resolve(parts, datetime(2023,11,8,11,33)), datetime(2023,11,8,13,33))
+        self.assertIsNone(interpret('tomorrow tomorrow'))
+        self.assertIsNone(resolve(None))
+
+    def test_timezone_is_checked_again(self):
+        # "grand" is only a timezone while every timezone with that name has the same offset
+        january = pytz.utc.localize(datetime(2024,1,10,12))
+        july = pytz.utc.localize(datetime(2024,7,10,12))
+        self.assertIsNone(interpret('5pm grand', base_date=january).timezone)
+        self.assertEqual(interpret('5pm grand', base_date=july).timezone, pytz.timezone('America/Campo_Grande'))
+        self.assertIsNone(interpret('5pm grand', base_date=january).timezone)
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_granularity(self):
+        base_date = datetime(2023,11,8,11,33)
+        self.assertEqual(result_granularity(interpret('tomorrow', base_date=base_date)), GRANULARITY_DAY)
+        self.assertEqual(result_granularity(interpret('in 3 days', base_date=base_date)), GRANULARITY_DAY)
+        self.assertEqual(result_granularity(interpret('today', base_date=base_date)), GRANULARITY_HOUR)
+        self.assertEqual(result_granularity(interpret('15th', base_date=base_date)), GRANULARITY_HOUR)
+        self.assertEqual(result_granularity(interpret('15th 10:30', base_date=base_date)), GRANULARITY_MINUTE)
+        self.assertEqual(result_granularity(interpret('in 2 hours', base_date=base_date)), GRANULARITY_MINUTE)
+        self.assertEqual(result_granularity(interpret('in 3 days', base_date=base_date), other_timezone=True), GRANULARITY_SECOND)
+        self.assertIsNone(result_granularity(interpret('later tonight', base_date=base_date)))
+
+    def test_hits_and_misses(self):
+        cache = ResultCache(maxsize=2)
+        # tomorrow is the same during the whole day
+        self.assertEqual(parse('tomorrow', base_date=datetime(2023,11,8,11,33), cache=cache), datetime(2023,11,9,DEFAULT_HOUR))
+        self.assertEqual(parse('tomorrow', base_date=datetime(2023,11,8,23,59), cache=cache), datetime(2023,11,9,DEFAULT_HOUR))
+        self.assertEqual(parse('tomorrow', base_date=datetime(2023,11,9,0,1), cache=cache), datetime(2023,11,10,DEFAULT_HOUR))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        # in 2 hours changes every minute
+        self.assertEqual(parse('in 2 hours', base_date=datetime(2023,11,8,11,33), cache=cache), datetime(2023,11,8,13,33))
+        self.assertEqual(parse('in 2 hours', base_date=datetime(2023,11,8,11,34), cache=cache), datetime(2023,11,8,13,34))
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        self.assertEqual(len(cache), 2)
+
+        # a time just on the start of the hour is kept apart
+        cache.clear()
+        self.assertIsNone(parse('8th', base_date=datetime(2023,11,8,9), cache=cache))
+        self.assertEqual(parse('8th', base_date=datetime(2023,11,8,8,59), cache=cache), datetime(2023,11,8,9))
+        self.assertIsNone(parse('8th', base_date=datetime(2023,11,8,9,30), cache=cache))
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+
+
+class TestParseMany(unittest.TestCase):
+
+    def test_same_as_parse(self):
+        base_date = datetime(2023,11,8,11,33)
+        texts = ['tomorrow', 'in 2 hours', 'Tomorrow', 'xyz', 'friday 5pm', 'tomorrow', 'mañana']
+        expected = [parse(x, base_date=base_date) for x in texts]
+        self.assertEqual(parse_many(texts, base_date=base_date), expected)
+        self.assertEqual(parse_many(['manana', 'mañana'], base_date=base_date, language='es'), [datetime(2023,11,9,DEFAULT_HOUR)] * 2)
+
+        tz = pytz.timezone('America/Chicago')
+        expected = [parse(x, base_date=base_date, locale_timezone=tz) for x in texts]
+        self.assertEqual(parse_many(texts, base_date=base_date, locale_timezone=tz, cache=ResultCache()), expected)
+
+    def test_repeated_texts_are_parsed_once(self):
+        base_date = datetime(2023,11,8,11,33)
+        with mock.patch('dateparser.interpret', wraps=interpret) as interpreted:
+            results = parse_iter((x for x in ['tomorrow', 'TOMORROW', 'next week', 'tomorrow']), base_date=base_date)
+            self.assertEqual(next(results), datetime(2023,11,9,DEFAULT_HOUR))
+            self.assertEqual(list(results), [datetime(2023,11,9,DEFAULT_HOUR), datetime(2023,11,13,DEFAULT_HOUR),
+                datetime(2023,11,9,DEFAULT_HOUR)])
+        self.assertEqual(interpreted.call_count, 2)
+
+    def test_workers(self):
+        base_date = datetime(2023,11,8,11,33)
+        tz = pytz.timezone('America/Chicago')
+        texts = ['tomorrow', 'in 2 hours', 'xyz', 'friday 5pm', '5am buenos aires', 'next week', 'tomorrow'] * 10
+        expected = [parse(x, base_date=base_date, locale_timezone=tz) for x in texts]
+        self.assertEqual(parse_many(texts, base_date=base_date, locale_timezone=tz, workers=2, batch_size=4,
+            cache=ResultCache()), expected)
+        self.assertEqual(parse_many(iter([]), workers=2), [])
+
+    def test_errors(self):
+        # a timezone in the text needs a base date in a timezone
+        base_date = datetime(2023,11,8,11,33)
+        with self.assertRaises(TypeError):
+            parse_many(['5am buenos aires', 'tomorrow'], base_date=base_date)
+        self.assertEqual(parse_many(['5am buenos aires', 'tomorrow'], base_date=base_date, errors='ignore'),
+            [None, datetime(2023,11,9,DEFAULT_HOUR)])
+
+
+class TestResolveMany(unittest.TestCase):
+
+    texts = ['tomorrow', 'today', 'tonight', 'weekend', 'next week', 'next month', 'next year', 'later tonight',
+        'friday', 'friday 5pm', 'monday 15th', 'in 2 hours', 'in 3 days', '2mo 3d', 'q3', 'next quarter', '15th 10:30',
+        '31st', 'feb 29', 'jan 15th 2025', 'march', '2026', 'at 5', 'xyz']
+    base_date = datetime(2024,1,9,22,15,30)
+    base_dates = [datetime(2024,1,9,22,15,30) + timedelta(days=x * 13, hours=x * 5, minutes=x) for x in range(len(texts))]
+
+    def test_same_as_resolve(self):
+        parts = [interpret(x, base_date=self.base_date) for x in self.texts]
+        self.assertEqual(resolve_many(parts, self.base_dates), [resolve(x, y) for x, y in zip(parts, self.base_dates)])
+        self.assertEqual(resolve_many(parts, self.base_date), [resolve(x, self.base_date) for x in parts])
+        with self.assertRaises(ValueError):
+            resolve_many(parts, self.base_dates[1:])
+
+        # rows with timezones are resolved row by row
+        tz = pytz.timezone('America/Chicago')
+        parts = [interpret(x, base_date=self.base_date) for x in ['tomorrow', '5am buenos aires', 'in 2 hours']] + [None]
+        base_dates = self.base_dates[:len(parts)]
+        self.assertEqual(resolve_many(parts, base_dates, tz), [resolve(x, y, tz) for x, y in zip(parts, base_dates)])
+
+    @unittest.skipIf(numpy is None, "numpy isn't installed")
+    def test_base_dates_array(self):
+        parts = [interpret(x, base_date=self.base_date) for x in self.texts]
+        self.assertEqual(resolve_many(parts, numpy.array(self.base_dates, dtype='datetime64[us]')),
+            [resolve(x, y) for x, y in zip(parts, self.base_dates)])
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.directory.name, 'input.txt')
+        self.output = os.path.join(self.directory.name, 'output.txt')
+        with open(self.input, 'w', encoding='utf-8') as write_file:
+            write_file.write('tomorrow\nxyz\r\nin 2 hours\n5am buenos aires\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_output(self):
+        with open(self.output, encoding='utf-8') as read_file:
+            return read_file.read().splitlines()
+
+    def test_iso_dates(self):
+        self.assertEqual(main([self.input, '-o', self.output, '--base-date', '2024-05-02T09:35', '--tz', 'America/Chicago']), 0)
+        self.assertEqual(self.read_output(), ['2024-05-03T09:00:00-05:00', '', '2024-05-02T11:35:00-05:00',
+            '2024-05-03T05:00:00-03:00'])
+
+    def test_jsonl_with_workers(self):
+        main([self.input, '-o', self.output, '--base-date', '2024-05-02T09:35', '--tz', 'America/Chicago', '--jsonl',
+            '--workers', '2', '--batch-size', '1'])
+        self.assertEqual([json.loads(x) for x in self.read_output()], [
+            {'text': 'tomorrow', 'date': '2024-05-03T09:00:00-05:00'}, {'text': 'xyz', 'date': None},
+            {'text': 'in 2 hours', 'date': '2024-05-02T11:35:00-05:00'},
+            {'text': '5am buenos aires', 'date': '2024-05-03T05:00:00-03:00'}])
+
+    def test_module_reads_stdin(self):
+        output = subprocess.run([sys.executable, '-m', 'dateparser', '--base-date', '2024-05-02T09:35'], input='tomorrow\n',
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(output.stdout, '2024-05-03T09:00:00\n')
+
+    def test_without_client_module(self):
+        # dateparser.py can be copied alone, the client module is only needed to connect to the daemon
+        with mock.patch.dict(sys.modules, {'dateparser_client': None}):
+            self.assertEqual(main([self.input, '-o', self.output, '--base-date', '2024-05-02T09:35']), 0)
+        self.assertEqual(self.read_output()[0], '2024-05-03T09:00:00')
+        self.assertEqual(DEFAULT_SOCKET, dateparser_client.DEFAULT_SOCKET)
+
+    def test_suggest(self):
+        base_date = datetime(2024,5,2,9,35)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            suggestions = suggest('week', base_date=base_date)
+        # the library only returns the suggestions, the command line writes them
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertIn(('next week', datetime(2024,5,6,DEFAULT_HOUR)), suggestions)
+        self.assertEqual(main(['--suggest', 'week', '-o', self.output, '--base-date', '2024-05-02T09:35']), 0)
+        self.assertEqual(self.read_output()[:2], ['POSSIBLE DATES:', 'weekend 2024-05-04 09:00:00 '])
+        self.assertEqual(main(['--suggest', 'tomorrow', '-o', self.output, '--base-date', '2024-05-02T09:35']), 0)
+        self.assertEqual(self.read_output(), ['2024-05-03 09:00:00 '])
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'dateparser.sock')
+        self.server = make_server(self.path)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_parse(self):
+        tz = pytz.timezone('America/Chicago')
+        base_date = datetime(2024,5,2,9,35)
+        with Client(self.path) as client:
+            self.assertEqual(client.parse('tomorrow', base_date=base_date, tz='America/Chicago'),
+                parse('tomorrow', base_date=base_date, locale_timezone=tz))
+            self.assertEqual(client.parse('xyz', base_date='2024-05-02T09:35'), None)
+            texts = ['in 2 hours', '5am buenos aires', 'mañana']
+            self.assertEqual(client.parse_many(texts, language='es', base_date=base_date),
+                parse_many(texts, language='es', base_date=base_date, errors='ignore'))
+            self.assertEqual(client.suggest('tomorrow', base_date=base_date), datetime(2024,5,3,DEFAULT_HOUR))
+            with self.assertRaises(DaemonError):
+                client.request({'op': 'parse', 'text': 'tomorrow', 'tz': 'Nowhere/City'})
+            # the connection is still open after an error
+            self.assertEqual(client.parse('tomorrow', base_date=base_date), datetime(2024,5,3,DEFAULT_HOUR))
+
+    def test_socket_file(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        # a file that isn't a socket is never removed
+        path = os.path.join(self.directory.name, 'dates.txt')
+        with open(path, 'w', encoding='utf-8') as write_file:
+            write_file.write('tomorrow\n')
+        with self.assertRaises(OSError):
+            make_server(path)
+        with open(path, encoding='utf-8') as read_file:
+            self.assertEqual(read_file.read(), 'tomorrow\n')
+
+
+class TestAsyncParser(unittest.TestCase):
+
+    def test_concurrent_calls_are_batched(self):
+        base_date = datetime(2024,5,2,9,35)
+        texts = ['tomorrow', 'in 2 hours', 'xyz', '5am buenos aires', 'friday 5pm'] * 4
+
+        async def run():
+            parser = AsyncParser(max_batch=8)
+            return await asyncio.gather(*[parser.parse(x, base_date=base_date) for x in texts], return_exceptions=True)
+
+        with mock.patch('dateparser.parse_many', wraps=parse_many) as parsed:
+            results = asyncio.run(run())
+        self.assertEqual(parsed.call_count, 3)
+        self.assertEqual(results[:3], [parse(x, base_date=base_date) for x in texts[:3]])
+        # a text that can't be resolved only fails its own call
+        self.assertIsInstance(results[3], TypeError)
+        self.assertEqual(results[4], datetime(2024,5,3,17))
+
+    def test_suggest(self):
+        base_date = datetime(2024,5,2,9,35)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            suggestions = asyncio.run(AsyncParser().suggest('week', base_date=base_date))
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertEqual(suggestions, suggest('week', base_date=base_date))
+
+    def test_timeout_and_backpressure(self):
+        async def run():
+            parser = AsyncParser(window=1, timeout=0.01)
+            with self.assertRaises(asyncio.TimeoutError):
+                await parser.parse('tomorrow')
+            parser = AsyncParser(max_pending=2)
+            base_date = datetime(2024,5,2,9,35)
+            return await asyncio.gather(*[parser.parse(x, base_date=base_date) for x in ['tomorrow', 'q3', 'tonight']])
+
+        self.assertEqual(asyncio.run(run()), [datetime(2024,5,3,DEFAULT_HOUR), datetime(2024,7,1,DEFAULT_HOUR),
+            datetime(2024,5,2,20)])
+
+
+class TestSearch(unittest.TestCase):
+
+    def test_dates_in_text(self):
+        base_date = datetime(2024,5,2,9,35)
+        text = ("The report is due tomorrow at 5pm, I have 3 apples.\n"
+            "Move the review to friday at 10 am. The deploy is on 2024-06-03 10:30, or in 2 days.\n"
+            "Monday, May 20th is a holiday, see you on the 15th of june.")
+        found = list(search(text, base_date=base_date))
+        self.assertEqual([x[1] for x in found], ['tomorrow at 5pm', 'friday at 10 am', '2024-06-03 10:30', 'in 2 days',
+            'Monday, May 20th', '15th of june'])
+        for (start, end), matched, _ in found:
+            self.assertEqual(text[start:end], matched)
+        self.assertEqual([x[2] for x in found], [datetime(2024,5,3,17), datetime(2024,5,3,10), datetime(2024,6,3,10,30),
+            datetime(2024,5,4,DEFAULT_HOUR), datetime(2024,5,20,DEFAULT_HOUR), datetime(2024,6,15,DEFAULT_HOUR)])
+        self.assertEqual(list(search("I have 3 apples and 2 oranges", base_date=base_date)), [])
+
+    def test_linear_time(self):
+        base_date = datetime(2024,5,2,9,35)
+        text = "Ping me in 45 minutes, or at 17:40. Nothing about dates in this sentence. "
+        found = list(search(text * 200, base_date=base_date))
+        self.assertEqual(len(found), 400)
+        self.assertEqual(found[-1][0][0], len(text) * 199 + text.index('17:40'))
+
+
+class TestTimestamp(unittest.TestCase):
+
+    def test_iso(self):
+        base_date = datetime(2024,5,2,9,35)
+        self.assertEqual(parse('2024-05-02 10:00', base_date=base_date), datetime(2024,5,2,10))
+        self.assertEqual(parse('2024-05-02T09:35:01', base_date=base_date), datetime(2024,5,2,9,35,1))
+        self.assertEqual(parse('2024-05-03', base_date=base_date), datetime(2024,5,3,DEFAULT_HOUR))
+        self.assertEqual(parse('2024-06-03 10:30:15.25', base_date=base_date), datetime(2024,6,3,10,30,15,250000))
+        self.assertEqual(parse('2024-05-02T16:00:00Z', base_date=base_date, locale_timezone=ZoneInfo('America/Chicago')),
+            datetime(2024,5,2,16,tzinfo=UTC))
+        self.assertEqual(parse('2024-05-03T10:00+02:00', base_date=base_date, locale_timezone=ZoneInfo('UTC')).utcoffset(),
+            timedelta(hours=2))
+        self.assertEqual(parse('2024-05-02 10:00', base_date=base_date, locale_timezone=ZoneInfo('America/Chicago')),
+            datetime(2024,5,2,10,tzinfo=ZoneInfo('America/Chicago')))
+        # it must be in the future, and a valid date
+        self.assertIsNone(parse('2024-05-02 09:35', base_date=base_date))
+        self.assertIsNone(parse('2023-01-01', base_date=base_date))
+        self.assertIsNone(parse('2024-02-30 10:00', base_date=base_date))
+        self.assertIsNone(parse('2024-05-02T00:00:00Z', base_date=base_date, locale_timezone=ZoneInfo('Asia/Tokyo')))
+
+    def test_rfc(self):
+        base_date = datetime(2024,5,2,9,35)
+        self.assertEqual(parse('Thu, 02 May 2024 20:00:00 +0000', base_date=base_date, locale_timezone=ZoneInfo('UTC')),
+            datetime(2024,5,2,20,tzinfo=UTC))
+        self.assertEqual(parse('Fri, 3 May 2024 10:00 GMT', base_date=base_date, locale_timezone=ZoneInfo('UTC')),
+            datetime(2024,5,3,10,tzinfo=UTC))
+        # the weekday must be the one of the date
+        self.assertIsNone(parse('Mon, 02 May 2024 20:00:00 +0000', base_date=base_date, locale_timezone=ZoneInfo('UTC')))
+
+    def test_offset_with_naive_base_date(self):
+        # without locale_timezone, base_date is in the local timezone
+        base_date = datetime(2024,5,2,9,35)
+        self.assertEqual(parse('2024-06-01T10:00:00Z', base_date=base_date), datetime(2024,6,1,10,tzinfo=UTC))
+        self.assertEqual(parse('Sat, 01 Jun 2024 10:00:00 +0000', base_date=base_date), datetime(2024,6,1,10,tzinfo=UTC))
+        self.assertEqual(parse('Sat, 01 Jun 2024 10:00:00 GMT', base_date=base_date), datetime(2024,6,1,10,tzinfo=UTC))
+        self.assertIsNone(parse('2024-04-01T10:00:00Z', base_date=base_date))
+        self.assertIsNone(parse('Mon, 01 Apr 2024 10:00:00 +0000', base_date=base_date))
+        self.assertIsNone(parse('Mon, 01 Apr 2024 10:00:00 GMT', base_date=base_date))
+        self.assertEqual(list(parse_iter(['2024-06-01T10:00:00Z', '2024-04-01T10:00:00Z'], base_date=base_date)),
+            [datetime(2024,6,1,10,tzinfo=UTC), None])
+
+    def test_not_timestamp(self):
+        base_date = datetime(2024,5,2,9,35)
+        for text in ['tomorrow', '2024/05/03 10:00', '15th 10:30', '2024-05-03 at 10']:
+            self.assertIs(parse_timestamp(text, base_date), NOT_TIMESTAMP)
+        self.assertEqual(parse('2024/05/03 10:00', base_date=base_date), datetime(2024,5,3,10))
+
+
+class TestNumericWords(unittest.TestCase):
+
+    def test_kinds(self):
+        kinds = {'1st': 'ordinal', '22nd': 'ordinal', '10:30': 'time', '10:30:15': 'time', '5pm': 'time',
+            '1:00a.m.': 'time', '5p': 'time', 'q3': 'quarter', 'q12': 'quarter', '2024-05-02': 'separated',
+            '5/2': 'separated', 'nov-24': 'separated', '3\\4': 'separated'}
+        for word, kind in kinds.items():
+            self.assertEqual(NUMERIC_WORD_KINDS.fullmatch(word).lastgroup, kind)
+        # words that go through every check: a dash before an ordinal or am/pm, a time with an hour only
+        for word in ['1-5th', '10-11pm', '10::30', '1:2:3:4', '10:30h', 'tomorrow']:
+            self.assertIsNone(NUMERIC_WORD_KINDS.fullmatch(word))
+
+    def test_same_parts(self):
+        base_date = datetime(2024,5,2,9,35)
+        self.assertEqual(interpret('10:30:15pm', base_date=base_date)[6:9], (22, 30, 15))
+        self.assertEqual(interpret('12:00a.m.', base_date=base_date).hour, 12)
+        self.assertIsNone(interpret('q5', base_date=base_date))
+        self.assertIsNone(interpret('1-5th', base_date=base_date))
+        self.assertEqual(parse('nov-24 10am', base_date=base_date), datetime(2024,11,24,10))
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(normalize('Next Friday 5PM'), 'next friday 5pm')
+        self.assertEqual(normalize('Mañana a las 5pm, el MIÉRCOLES'), 'manana a las 5pm, el miercoles')
+        self.assertEqual(normalize('ﬁn  ²'), 'fin  2')
+
+    def test_accents_are_stripped_once(self):
+        strip_accents.cache_clear()
+        self.assertEqual(normalize('mañana 5pm'), 'manana 5pm')
+        self.assertEqual(normalize('5pm mañana'), '5pm manana')
+        self.assertEqual(strip_accents.cache_info().hits, 1)
+
+
+class TestWeekdaySearch(unittest.TestCase):
+
+    def test_find_weekday_date(self):
+        # Monday 3rd
+        self.assertEqual(find_weekday_date(2024, 5, 3, 0, 1, 99999), (2024, 6, 3))
+        # Saturday 29th February, the 29th becomes the 28th after 2024 like with relativedelta
+        self.assertEqual(find_weekday_date(2024, 2, 29, 5, 12, 99999), (2026, 2, 28))
+        self.assertEqual(find_weekday_date(2024, 2, 29, 3, 12, 99999), (2024, 2, 29))
+        # Monday 3rd 2024 after June, and the first month after the year is looked at too
+        self.assertIsNone(find_weekday_date(2024, 7, 3, 0, 1, 2024))
+        self.assertEqual(find_weekday_date(2024, 7, 3, 4, 1, 2024), (2025, 1, 3))
+        self.assertEqual(weekday_of(2100, 3, 1), datetime(2100, 3, 1).weekday())
+
+    def test_months_are_not_scanned(self):
+        # every weekday and day from months before a year that isn't leap and near the last year
+        with mock.patch('bisect.bisect_left', wraps=bisect.bisect_left) as searched,\
+                mock.patch('dateparser.weekday_of') as weekday_of_called,\
+                mock.patch('dateparser.month_days', wraps=month_days) as month_days_called:
+            for year, month in [(2099, 1), (2099, 12), (2024, 2), (2001, 1), (9980, 12)]:
+                for weekday, day, step in itertools.product(range(7), range(1, month_days(year, month) + 1), [1, 12]):
+                    searched.reset_mock()
+                    month_days_called.reset_mock()
+                    try:
+                        find_weekday_date(year, month, day, weekday, step, 99999)
+                    except ValueError:
+                        pass
+                    # two binary searches for the day and for every shorter month that changes it (31st, 30th, 29th)
+                    self.assertLessEqual(searched.call_count, 8)
+                    self.assertLessEqual(month_days_called.call_count, 3)
+        self.assertFalse(weekday_of_called.called)
+
+
+class TestCalendarTable(unittest.TestCase):
+
+    def test_table(self):
+        self.assertEqual(len(FIRST_WEEKDAYS), 4800)
+        self.assertEqual(sum(MONTH_LENGTHS), 146097)
+        for year in [1, 1900, 2000, 2024, 2100, 2399, 9999]:
+            for month in range(1, 13):
+                self.assertEqual(weekday_of(year, month, 1), datetime(year, month, 1).weekday())
+                self.assertEqual(month_days(year, month), calendar.monthrange(year, month)[1])
+
+    def test_branches(self):
+        base_date = datetime(2024,5,31,21,35)
+        self.assertEqual(future_datetime(special=NEXT_MONTH, base_date=base_date), datetime(2024,6,1,DEFAULT_HOUR))
+        self.assertEqual(future_datetime(special=NEXT_YEAR, base_date=base_date), datetime(2025,1,1,DEFAULT_HOUR))
+        self.assertEqual(future_datetime(special=WEEKEND, base_date=base_date), datetime(2024,6,8,DEFAULT_HOUR))
+        # the next 31st is in July, and a Friday of February is next year
+        self.assertEqual(future_datetime(day_number=31, hour=10, base_date=base_date), datetime(2024,7,31,10))
+        self.assertEqual(future_datetime(weekday=4, month=2, base_date=base_date), datetime(2025,2,7,DEFAULT_HOUR))
+
+    def test_complete_date_that_can_not_be_changed(self):
+        base_date = datetime(2024,5,31,21,35)
+        # a complete date that is past doesn't look for another one
+        self.assertIsNone(future_datetime(day_number=31, month=12, year=2023, base_date=base_date))
+        self.assertIsNone(future_datetime(day_number=31, month=5, year=2024, hour=10, base_date=base_date))
+        # a date that doesn't exist
+        self.assertIsNone(future_datetime(day_number=31, month=4, year=2025, base_date=base_date))
+        self.assertIsNone(future_datetime(day_number=29, month=2, year=2025, base_date=base_date))
+        self.assertEqual(future_datetime(day_number=29, month=2, year=2028, base_date=base_date),
+            datetime(2028,2,29,DEFAULT_HOUR))
+
+    def test_weekday_at_the_end_of_year_9999(self):
+        # there isn't another Monday in 9999, like in any other year
+        base_date = datetime(9999,12,29,10)
+        self.assertIsNone(future_datetime(weekday=0, year=9999, base_date=base_date))
+        self.assertIsNone(future_datetime(weekday=0, month=12, year=9999, base_date=base_date))
+        self.assertEqual(future_datetime(weekday=4, year=9999, base_date=base_date), datetime(9999,12,31,10))
+        # without the year, the next one is after 9999
+        with self.assertRaises(ValueError):
+            future_datetime(weekday=0, month=12, base_date=base_date)
+
+
 if __name__ == '__main__':
     unittest.main()